@@ -60,6 +60,11 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # Create the database if it doesn't exist (no longer done on import of `app.utils.database`)
+    if settings.POSTGRES_CREATE_DATABASE:
+        from app.utils import database
+        database.provision()
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
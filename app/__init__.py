@@ -1,73 +1,57 @@
 """Main File for FastAPI SRM Student Portal Attendance Manager API."""
 
-import os
-import json
 import asyncio
 from contextlib import asynccontextmanager
 from app.logging import logger
+from app.config import settings
 from fastapi import FastAPI, HTTPException, Depends
-from sqlalchemy.orm import Session
-# from app.utils.update_attendence_database import update_attendence_database
-from app.utils.attendance_manager import AttendanceManager
-from app.routers import timetable, subject_alias, attendance
-from app.utils import database
-
-# async def update_attendence():
-#     """Update Attendence Database."""
-#     while True:
-#         db = Database()
-#         users = db.get_all_users()
-#         tasks = []
-#         for username, password in users:
-#             tasks.append(
-#                 update_attendence_database(
-#                     username, password, AttendanceManager, db.cursor, db.conn
-#                 )
-#             )
-
-#         result = await asyncio.gather(*tasks)
-#         print("Today:", datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-#         for r in result:
-#             print(r)
-#         del db
-#         await asyncio.sleep(1000)
-
+from app.utils.session_pool import session_pool
+from app.utils.ocr import ocr_pool
+from app.utils.http_client import portal_http
+from app.utils.sync_engine import sync_engine
+from app.utils.attendance_diff import diff_engine
+from app.utils.webhooks import webhook_delivery
+from app.utils.timetable_store import timetable_store
+from app.utils.legend_cache import legend_cache
+from app.utils.profiler import ProfilerMiddleware
+from app.routers import timetable, subject_alias, attendance, health, notification, webhook, metrics
+from app.utils import database, crypto
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Lifespan")
+    if settings.POSTGRES_CREATE_DATABASE:
+        try:
+            await asyncio.to_thread(database.provision)
+        except Exception as e:
+            # Endpoints that need the database fail until it is reachable, the rest keep working
+            logger.error(f"Error in provisioning database: {e}")
+
+    portal_http.start()
+    session_pool.start()
+
+    await legend_cache.load()
+
+    # Serve the timetable from disk, or fetch it in the background without blocking startup
+    timetable_store.start()
+
+    if settings.SYNC_ENABLED:
+        # Fail at startup rather than on the first claimed user, the sync reads the stored passwords
+        crypto.fernet()
+        webhook_delivery.start()
+        diff_engine.start()
+        sync_engine.start()
 
-    while True:
-        if os.path.exists('cache/timetable.json'):
-            with open('cache/timetable.json', 'r') as f:
-                app.cached_timetable = json.loads(f.read())
-                logger.info("Timetable Cached")
-                break
-        else:
-            try:
-                am = AttendanceManager()
-                await am.login()
-                # FIXME: db should be a dependency
-                db: Session = next(database.get_db())
-                app.cached_timetable = await am.get_timetable(db)
-                
-                # Write Timetable to Cache
-                with open('cache/timetable.json', 'w') as f:
-                    f.write(json.dumps(app.cached_timetable, indent=4))
-                
-                logger.info("Timetable Cached")
-                break
-            
-            except HTTPException as e:
-                logger.error(f"Error in caching timetable: {e}")
-                await asyncio.sleep(2)
-                
-            finally:
-                await am.close()
-    
-    # asyncio.create_task(update_attendence())
     yield
     logger.info("Stopping Lifespan")
+    await sync_engine.stop()
+    await diff_engine.stop()
+    await webhook_delivery.stop()
+    await timetable_store.stop()
+    await session_pool.close()
+    await portal_http.close()
+    ocr_pool.shutdown()
+    await database.engine.dispose()
 
 app = FastAPI(
     title="SRM Student Portal Attendance Manager API",
@@ -82,3 +66,11 @@ app = FastAPI(
 app.include_router(timetable.router)
 app.include_router(subject_alias.router)
 app.include_router(attendance.router)
+app.include_router(health.router)
+app.include_router(notification.router)
+app.include_router(webhook.router)
+app.include_router(metrics.router)
+
+# Opt-in request profiling, not installed at all unless enabled
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
@@ -26,10 +26,136 @@ class Settings(BaseSettings):
     def get_postgres_uri(cls) -> str:
         return f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 
+    @classmethod
+    def get_postgres_async_uri(cls) -> str:
+        return f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+
+    # Create the database on startup if it doesn't exist
+    POSTGRES_CREATE_DATABASE: bool = True
+
+    # PostgreSQL Connection Pool Configuration
+    POSTGRES_POOL_SIZE: int = 10
+    POSTGRES_MAX_OVERFLOW: int = 20
+    POSTGRES_POOL_TIMEOUT: int = 30
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+
+    # SRM Student Portal Configuration (point it at a local mock portal for load tests)
+    PORTAL_BASE_URL: str = "https://sp.srmist.edu.in/srmiststudentportal"
+
     # SRM Student Portal Credentials
     SRM_PORTAL_USERNAME: str
     SRM_PORTAL_PASSWORD: str
 
+    # Encryption of stored portal passwords (Fernet keys, comma separated: the first one encrypts, all of them decrypt)
+    # Needed for the background sync and notifications, which store user passwords. Generate one with
+    # `python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"`
+    PASSWORD_ENCRYPTION_KEY: str | None = None
+
+    # SRM Student Portal HTTP Connection Pool Configuration (timeouts in seconds)
+    PORTAL_HTTP_MAX_CONNECTIONS: int = 100
+    PORTAL_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    PORTAL_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    PORTAL_HTTP_CONNECT_TIMEOUT: float = 5.0
+    PORTAL_HTTP_READ_TIMEOUT: float = 20.0
+    PORTAL_HTTP_WRITE_TIMEOUT: float = 10.0
+    PORTAL_HTTP_POOL_TIMEOUT: float = 10.0
+    PORTAL_HTTP2: bool = False
+
+    # SRM Student Portal Request Limits (per host)
+    PORTAL_MAX_CONCURRENCY: int = 16
+    PORTAL_MIN_CONCURRENCY: int = 1
+    PORTAL_RATE_LIMIT: float = 20.0  # requests per second
+    PORTAL_RATE_BURST: int = 20
+    PORTAL_SLOW_RESPONSE_SECONDS: float = 5.0
+
+    # SRM Student Portal Session Pool Configuration (all durations in seconds)
+    PORTAL_SESSION_TTL: int = 900
+    PORTAL_SESSION_REFRESH_MARGIN: int = 120
+    PORTAL_SESSION_IDLE_TIMEOUT: int = 3600
+    PORTAL_SESSION_REFRESH_INTERVAL: int = 30
+    PORTAL_SESSION_POOL_SIZE: int = 256
+
+    # SRM Student Portal Login Configuration
+    LOGIN_MAX_ATTEMPTS: int = 5
+    LOGIN_DEADLINE_SECONDS: float = 30.0
+    LOGIN_RACE_ATTEMPTS: int = 1
+
+    # Attendance Response Cache Configuration (in seconds)
+    ATTENDANCE_CACHE_TTL: int = 60
+    ATTENDANCE_CACHE_STALE_TTL: int = 300
+
+    # Subjects Index Configuration (in seconds)
+    SUBJECT_INDEX_MAX_AGE: int = 300
+
+    # Timetable Cache Configuration (durations in seconds)
+    TIMETABLE_CACHE_PATH: str = "cache/timetable.json"
+    TIMETABLE_WARMUP_BACKOFF_SECONDS: float = 2.0
+    TIMETABLE_WARMUP_MAX_BACKOFF_SECONDS: float = 300.0
+    TIMETABLE_HTTP_MAX_AGE: int = 300
+
+    # Timetable Legends Cache Configuration
+    LEGEND_CACHE_PATH: str = "cache/legends.json"
+    LEGEND_CACHE_MAX_AGE: int = 86400
+
+    # Monthly Absent Details Cache Configuration
+    MONTHLY_ABSENT_CACHE_DIR: str = "cache/monthly_absent"
+    MONTHLY_ABSENT_CACHE_MAX_ACCOUNTS: int = 1024  # accounts kept in memory, the others are read from disk again
+
+    # Background Attendance Sync Configuration (in seconds)
+    SYNC_ENABLED: bool = False
+    SYNC_INTERVAL_SECONDS: int = 3600
+    SYNC_JITTER_SECONDS: int = 300
+    SYNC_MAX_CONCURRENT_USERS: int = 8
+    SYNC_POLL_SECONDS: int = 30
+    SYNC_LEASE_SECONDS: int = 600
+    SYNC_MAX_BACKOFF_SECONDS: int = 21600
+
+    # Attendance Diff Configuration
+    DIFF_BATCH_SIZE: int = 500
+    DIFF_FLUSH_SECONDS: float = 10.0
+    DIFF_MAX_ATTEMPTS: int = 5  # failed flushes before a batch is split, and a single snapshot is dropped
+    DIFF_MAX_PENDING: int = 50000  # newer snapshots are not diffed while this many are queued
+
+    # Notification Stream Configuration
+    NOTIFICATION_STREAM_KEEPALIVE_SECONDS: float = 15.0
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+
+    # Webhook Delivery Configuration (durations in seconds)
+    WEBHOOK_MAX_CONCURRENCY: int = 10
+    WEBHOOK_MAX_BATCH_SIZE: int = 50
+    WEBHOOK_BATCH_WAIT_SECONDS: float = 1.0
+    WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    WEBHOOK_MAX_ATTEMPTS: int = 5
+    WEBHOOK_BACKOFF_SECONDS: float = 2.0
+    WEBHOOK_MAX_BACKOFF_SECONDS: float = 300.0
+    WEBHOOK_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0  # unsent requests are dead-lettered after this on shutdown
+    WEBHOOK_ALLOWED_HOSTS: list[str] = []  # if set, only these hosts (and their subdomains) can be registered
+    # Allow loopback and private network targets, e.g. for local testing. Otherwise webhooks connect only to the
+    # public addresses checked right before connecting (so DNS rebinding cannot reach them) and ignore proxy env vars
+    WEBHOOK_ALLOW_PRIVATE_ADDRESSES: bool = False
+
+    # Captcha OCR Worker Pool Configuration
+    OCR_EXECUTOR: str = "thread"  # "thread" or "process"
+    OCR_MAX_WORKERS: int = 4
+    OCR_MAX_CONCURRENCY: int = 4
+
+    # Captcha Solver Configuration
+    CAPTCHA_SOLVER: str = "template"  # "template" (falls back to tesseract) or "tesseract"
+    CAPTCHA_GLYPHS_PATH: str = "cache/captcha_glyphs.npz"
+    CAPTCHA_MAX_DISTANCE: float = 0.25
+
+    # Request Profiler Configuration (the middleware is only installed when enabled)
+    PROFILER_ENABLED: bool = False
+    PROFILER_SAMPLE_RATE: float = 0.0  # share of requests profiled without the header
+    PROFILER_HEADER: str = "X-Profile"
+    PROFILER_TOKEN: str | None = None  # if set, the header must carry this value
+    PROFILER_INTERVAL_SECONDS: float = 0.005
+    PROFILER_MAX_SECONDS: float = 60.0  # longer requests (e.g. streams) are only profiled this long
+    PROFILER_MAX_CONCURRENT: int = 4
+    PROFILER_DIR: str = "cache/profiles"
+    PROFILER_DIR_MAX_BYTES: int = 50 * 1024 * 1024
+
     # JWT Configuration
     # JWT_SECRET_KEY: str
     # JWT_ALGORITHM: str
@@ -5,7 +5,8 @@ from fastapi import APIRouter, Depends, status, HTTPException, Response, Form
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
-from app.utils.attendance_manager import AttendanceManager
+from app.utils.session_pool import session_pool
+from app.utils.cache import attendance_cache
 from app.utils import database, models, schemas
 from app.config import settings
 
@@ -16,19 +17,19 @@ router = APIRouter(
 
 @router.post("/")
 async def get_attendance_details():
-    """Get Attendance Details."""
-    # Create Attendance Manager Instance
-    am = AttendanceManager()
-
-    # Login to SRM Student Portal
-    await am.login()
-
-    # Get Attendance Details
-    course_wise_attendance, monthly_absent_hours = await am.get_attendance_details()
-
-    await am.close()
-
-    return {
-        "CourseWiseAttendance": course_wise_attendance,
-        "MonthlyAttendance": monthly_absent_hours,
-    }
\ No newline at end of file
+    """Get Attendance Details.
+
+    Responses are cached per account for `ATTENDANCE_CACHE_TTL` seconds, and concurrent requests share one portal fetch.
+    """
+    async def fetch_attendance_details():
+        # Get a Logged In Attendance Manager Instance
+        async with session_pool.session() as am:
+            # Get Attendance Details
+            course_wise_attendance, monthly_absent_hours = await am.get_attendance_details()
+
+        return {
+            "CourseWiseAttendance": course_wise_attendance,
+            "MonthlyAttendance": monthly_absent_hours,
+        }
+
+    return await attendance_cache.get_or_fetch(settings.SRM_PORTAL_USERNAME, fetch_attendance_details)
\ No newline at end of file
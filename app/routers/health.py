@@ -0,0 +1,74 @@
+# Path: app/routers/health.py
+# Description: This file contains routers to inspect the health and load of the service.
+
+from fastapi import APIRouter, Response, status
+
+from app.config import settings
+from app.utils.ocr import ocr_pool
+from app.utils.cache import attendance_cache
+from app.utils.rate_limiter import portal_limiters
+from app.utils.legend_cache import legend_cache
+from app.utils.monthly_absent_cache import monthly_absent_cache
+from app.utils.sync_engine import sync_engine
+from app.utils.attendance_diff import diff_engine
+from app.utils.notification_hub import notification_hub
+from app.utils.webhooks import webhook_delivery
+from app.utils.timetable_store import timetable_store
+from app.utils.profiler import profiler
+
+router = APIRouter(
+    prefix='/health',
+    tags=['Health']
+)
+
+@router.get("/ready", responses={503: {"description": "Timetable warm-up is not done yet."}})
+async def get_readiness(response: Response):
+    """Get readiness, the service is ready once the timetable is loaded from disk or fetched from the portal."""
+    stats = timetable_store.stats()
+    if not stats["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return stats
+
+@router.get("/ocr")
+async def get_ocr_pool_stats():
+    """Get Captcha OCR Worker Pool limits and queue depth."""
+    return ocr_pool.stats()
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Get Response Cache sizes and hit/miss counters."""
+    return {
+        "attendance": attendance_cache.stats(),
+        "legends": legend_cache.stats(),
+        "monthly_absent": monthly_absent_cache.stats(),
+    }
+
+@router.get("/portal")
+async def get_portal_limits():
+    """Get current SRM Student Portal request limits and queue lengths per host."""
+    return portal_limiters.stats()
+
+@router.get("/sync")
+async def get_sync_stats():
+    """Get Background Attendance Sync worker pool usage and counters."""
+    return sync_engine.stats()
+
+@router.get("/diff")
+async def get_diff_stats():
+    """Get Attendance Diff queue length and counters."""
+    return diff_engine.stats()
+
+@router.get("/stream")
+async def get_stream_stats():
+    """Get connected notification stream clients and fan-out counters."""
+    return notification_hub.stats()
+
+@router.get("/webhooks")
+async def get_webhook_stats():
+    """Get Webhook Delivery queue lengths and counters."""
+    return webhook_delivery.stats()
+
+@router.get("/profiler")
+async def get_profiler_stats():
+    """Get Request Profiler settings and counters."""
+    return {"enabled": settings.PROFILER_ENABLED, **profiler.stats()}
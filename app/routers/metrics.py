@@ -0,0 +1,68 @@
+# Path: app/routers/metrics.py
+# Description: This file contains the router that exposes service metrics in the Prometheus text format.
+
+from fastapi import APIRouter, Response
+
+from app.utils.metrics import metrics
+from app.utils.ocr import ocr_pool
+from app.utils.cache import attendance_cache
+from app.utils.legend_cache import legend_cache
+from app.utils.monthly_absent_cache import monthly_absent_cache
+from app.utils.rate_limiter import portal_limiters
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(
+    tags=['Metrics']
+)
+
+def cache_metrics():
+    """Hit/miss counters of the caches in front of the portal."""
+    attendance = attendance_cache.stats()
+    yield "cache_requests_total", "counter", "Cache lookups per cache and result.", [
+        ({"cache": "attendance", "result": "hit"}, attendance["hits"]),
+        ({"cache": "attendance", "result": "stale_hit"}, attendance["stale_hits"]),
+        ({"cache": "attendance", "result": "miss"}, attendance["misses"]),
+        ({"cache": "legends", "result": "hit"}, legend_cache.hits),
+        ({"cache": "legends", "result": "miss"}, legend_cache.misses),
+        ({"cache": "monthly_absent", "result": "hit"}, monthly_absent_cache.hits),
+        ({"cache": "monthly_absent", "result": "miss"}, monthly_absent_cache.misses),
+    ]
+    yield "cache_coalesced_total", "counter", "Cache misses that waited for a fetch already in flight.", [
+        ({"cache": "attendance"}, attendance["coalesced"]),
+    ]
+
+def ocr_metrics():
+    """Captcha OCR worker pool load."""
+    yield "ocr_pool_queued", "gauge", "Captchas waiting for an OCR worker.", [({}, ocr_pool.queued)]
+    yield "ocr_pool_running", "gauge", "Captchas being solved.", [({}, ocr_pool.running)]
+    yield "ocr_pool_jobs_total", "counter", "Finished OCR jobs by result.", [
+        ({"result": "completed"}, ocr_pool.completed),
+        ({"result": "failed"}, ocr_pool.failed),
+    ]
+
+def portal_limiter_metrics():
+    """Adaptive portal limits per host."""
+    limiters = portal_limiters.stats()
+    yield "portal_concurrency_limit", "gauge", "Current adaptive concurrency limit per portal host.", [
+        ({"host": limiter["host"]}, limiter["concurrency_limit"]) for limiter in limiters
+    ]
+    yield "portal_in_flight", "gauge", "Portal requests in flight per host.", [
+        ({"host": limiter["host"]}, limiter["in_flight"]) for limiter in limiters
+    ]
+    yield "portal_waiting", "gauge", "Portal requests waiting for a slot or a rate limit token per host.", [
+        ({"host": limiter["host"]}, limiter["waiting_for_slot"] + limiter["waiting_for_token"]) for limiter in limiters
+    ]
+    yield "portal_backoffs_total", "counter", "Times the concurrency limit was halved after an error or slow response.", [
+        ({"host": limiter["host"]}, limiter["backoffs"]) for limiter in limiters
+    ]
+
+@router.get("/metrics", response_class=Response, responses={200: {"content": {PROMETHEUS_CONTENT_TYPE: {}}}})
+async def get_metrics():
+    """Get Metrics in the Prometheus text format: portal stage latencies, login captcha attempts, portal status codes and cache hit/miss counts."""
+    return Response(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+metrics.add_collector(cache_metrics)
+metrics.add_collector(ocr_metrics)
+metrics.add_collector(portal_limiter_metrics)
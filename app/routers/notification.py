@@ -1,36 +1,107 @@
-# @app.post("/notifications/unread")
-# async def get_unread_notifications(username: str = Form(default="")):
-#     """Get Notifications."""
-#     # Check Username
-#     if not username:
-#         raise HTTPException(
-#             status_code=400, detail="username is required form parameter"
-#         )
-
-#     # Check if User Exists in Database
-#     db = Database()
-#     if username not in [user for user, _ in db.get_all_users()]:
-#         raise HTTPException(
-#             status_code=400, detail=f"{username}: User Not registered for Notifications"
-#         )
-
-#     return Notifications().retrieve_unread_notifications(username)
-
-
-# @app.post("/notifications/all")
-# async def get_all_notifications(username: str = Form(default="")):
-#     """Get Notifications."""
-#     # Check Username
-#     if not username:
-#         raise HTTPException(
-#             status_code=400, detail="username is required form parameter"
-#         )
-
-#     # Check if User Exists in Database
-#     db = Database()
-#     if username not in [user for user, _ in db.get_all_users()]:
-#         raise HTTPException(
-#             status_code=400, detail=f"{username}: User Not registered for Notifications"
-#         )
-
-#     return Notifications().retrieve_all_notifications(username)
+# Path: app/routers/notification.py
+# Description: This file contains routers for reading attendance notifications.
+
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Response, Form, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.notifications import notifications, notification_model, sse_event, check_user
+from app.utils.notification_hub import notification_hub
+from app.utils import database, models
+from app.config import settings
+
+router = APIRouter(
+    prefix='/notifications',
+    tags=['Notifications']
+)
+
+def paginate(response: Response, rows: list[models.Notifications], limit: int) -> list[dict]:
+    """Serialize notifications and set the `X-Next-Cursor` header when there may be more."""
+    if rows and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1].Id)
+    return [notification_model(row).model_dump(exclude={"username"}) for row in rows]
+
+@router.post("/unread")
+async def get_unread_notifications(
+    response: Response,
+    username: str = Form(default=""),
+    cursor: int = Form(default=0, ge=0),
+    limit: int = Form(default=50, ge=1, le=500),
+    db: AsyncSession = Depends(database.get_db),
+):
+    """Get Unread Notifications, and mark them as read.
+
+    Pass the `X-Next-Cursor` response header as `cursor` to get the next page.
+    """
+    await check_user(db, username)
+    rows = await notifications.retrieve_unread_notifications(db, username, cursor, limit)
+    return paginate(response, rows, limit)
+
+@router.post("/all")
+async def get_all_notifications(
+    response: Response,
+    username: str = Form(default=""),
+    cursor: int = Form(default=0, ge=0),
+    limit: int = Form(default=50, ge=1, le=500),
+    db: AsyncSession = Depends(database.get_db),
+):
+    """Get All Notifications.
+
+    Pass the `X-Next-Cursor` response header as `cursor` to get the next page.
+    """
+    await check_user(db, username)
+    rows = await notifications.retrieve_all_notifications(db, username, cursor, limit)
+    return paginate(response, rows, limit)
+
+@router.get("/stream")
+async def stream_notifications(
+    username: str = Query(default=""),
+    last_event_id: int | None = Header(default=None, ge=0),
+):
+    """Stream new notifications as Server-Sent Events.
+
+    Reconnecting clients send the `Last-Event-ID` header (browsers do this automatically) and first get
+    every notification they missed. Streaming does not mark notifications as read.
+    """
+    async with database.Session() as db:
+        await check_user(db, username)
+
+    async def events():
+        # Subscribe before replaying, so nothing stored in between is missed
+        queue = notification_hub.subscribe(username)
+        try:
+            sent = last_event_id or 0
+            if last_event_id is not None:
+                while True:
+                    async with database.Session() as db:
+                        rows = await notifications.retrieve_all_notifications(db, username, sent, 500)
+                    for row in rows:
+                        yield sse_event(row)
+                        sent = row.Id
+                    if len(rows) < 500:
+                        break
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=settings.NOTIFICATION_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing idle connections
+                    yield b": keepalive\n\n"
+                    continue
+                if item is None:
+                    return
+                event_id, event = item
+                # Already sent by the replay
+                if event_id <= sent:
+                    continue
+                sent = event_id
+                yield event
+        finally:
+            notification_hub.unsubscribe(username, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
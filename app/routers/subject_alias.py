@@ -3,9 +3,13 @@
 
 from fastapi import APIRouter, Depends, status, HTTPException, Response
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.utils.attendance_manager import AttendanceManager
+from app.utils.session_pool import session_pool
+from app.utils.subject_index import subject_index
+from app.utils.legend_cache import legend_cache
 from app.utils import database, models, schemas
 from app.config import settings
 
@@ -14,6 +18,25 @@ router = APIRouter(
     tags=['Subject Alias']
 )
 
+async def find_subject(db: AsyncSession, subject_code: str = None, alias: str = None, subject_name: str = None) -> schemas.ResponseGetSubjectDetails:
+    """Find a subject in the in-memory index by subject code, alias, or subject name."""
+    index = await subject_index.ensure_loaded(db)
+    if subject_code:
+        subject = index.by_code.get(subject_code)
+        if not subject:
+            raise HTTPException(status_code=404, detail=f"Alias not found for Subject Code {subject_code}")
+    elif alias:
+        subject = index.by_alias.get(alias)
+        if not subject:
+            raise HTTPException(status_code=404, detail=f"Subject not found for Alias {alias}")
+    elif subject_name:
+        subject = index.by_name.get(subject_name)
+        if not subject:
+            raise HTTPException(status_code=404, detail=f"Subject not found for Subject Name {subject_name}")
+    else:
+        raise HTTPException(status_code=400, detail="Please provide subject_code, alias, or subject_name as a query parameter.")
+    return subject
+
 # add a new alias for a subject code
 @router.post("/", responses={
     201: {
@@ -32,12 +55,12 @@ router = APIRouter(
         "description": "Alias already exists for the given `SubjectCode`."
     },
 })
-async def add_subject_alias(data: schemas.CreateSubjectAlias, db: Session = Depends(database.get_db)):
+async def add_subject_alias(data: schemas.CreateSubjectAlias, db: AsyncSession = Depends(database.get_db)):
     # FIXME: This comment is not being displayed properly on FastAPI Swagger UI Docs.
     """Add Alias of a Subject.
 
     If the subject code is not present:
-        1. First, get the subject name from `get_subject_name_from_subject_code_form_timetable_page` function of `attendance_manager.py`.
+        1. First, get the subject name from the cached timetable legends, or (if the cache is outdated) from `get_subject_name_from_subject_code_form_timetable_page` function of `attendance_manager.py`.
             1.1. If subject name is not found, raise an HTTPException with status code 404.
             1.2. If subject name is found, add the subject code, subject name and alias to the database.
 
@@ -45,30 +68,30 @@ async def add_subject_alias(data: schemas.CreateSubjectAlias, db: Session = Depe
     """
     
     # Check if the subject code is present in the database
-    subject = db.query(models.Subjects).filter(models.Subjects.SubjectCode == data.subject_code).first()
+    subject = (await subject_index.ensure_loaded(db)).by_code.get(data.subject_code)
     
     # If the subject code is present
     if subject:
         # If the alias is already present
-        if subject.Alias:
+        if subject.alias:
             raise HTTPException(status_code=409, detail=f"Alias already exists for Subject Code {data.subject_code}")
         
         # Add the alias to the database
-        subject.Alias = data.alias
-        db.commit()
-        return JSONResponse({"subject_code": subject.SubjectCode, "subject_name": subject.SubjectName, "alias": data.alias}, status_code=status.HTTP_201_CREATED)
+        await db.execute(update(models.Subjects).where(models.Subjects.SubjectCode == subject.subject_code).values(Alias=data.alias))
+        await db.commit()
+        subject_index.invalidate()
+        return JSONResponse({"subject_code": subject.subject_code, "subject_name": subject.subject_name, "alias": data.alias}, status_code=status.HTTP_201_CREATED)
     
     # If the subject code is not present
     else:
-        # Create Attendance Manager Instance
-        am = AttendanceManager()
-        await am.login()
-        
         # Get the subject name from the subject code
-        subject_name = await am.get_subject_name_from_subject_code_from_timetable_page(data.subject_code)
-        
-        # Close the Attendance Manager Instance
-        await am.close()
+        subject_name = legend_cache.get(data.subject_code)
+
+        # Only ask the portal if the cached legends may be outdated
+        if not subject_name and not legend_cache.is_fresh():
+            # Get a Logged In Attendance Manager Instance
+            async with session_pool.session() as am:
+                subject_name = await am.get_subject_name_from_subject_code_from_timetable_page(data.subject_code)
         
         if not subject_name:
             raise HTTPException(status_code=404, detail=f"Subject Name for Subject Code {data.subject_code} not found for user {settings.SRM_PORTAL_USERNAME}")
@@ -77,10 +100,12 @@ async def add_subject_alias(data: schemas.CreateSubjectAlias, db: Session = Depe
             # Add the subject code, subject name and alias to the database
             new_subject = models.Subjects(SubjectCode=data.subject_code, SubjectName=subject_name, Alias=data.alias)
             db.add(new_subject)
-            db.commit()
+            await db.commit()
+            subject_index.invalidate()
             return JSONResponse({"subject_code": data.subject_code, "subject_name": subject_name, "alias": data.alias}, status_code=status.HTTP_201_CREATED)
         
-        except sqlalchemy.exc.IntegrityError:
+        except IntegrityError:
+            await db.rollback()
             raise HTTPException(status_code=409, detail=f"Alias already exists for Subject Code {data.subject_code}")
 
 @router.get("/", responses={
@@ -100,24 +125,11 @@ async def add_subject_alias(data: schemas.CreateSubjectAlias, db: Session = Depe
         "description": "Subject not found for the given query parameter."
     },
 })
-async def get_subject_details(subject_code: str = None, alias: str = None, subject_name: str = None, db: Session = Depends(database.get_db)) -> schemas.ResponseGetSubjectDetails:
+async def get_subject_details(subject_code: str = None, alias: str = None, subject_name: str = None, db: AsyncSession = Depends(database.get_db)) -> schemas.ResponseGetSubjectDetails:
     """Get Subject details by subject code, alias, or subject name."""
-    if subject_code:
-        subject = db.query(models.Subjects).filter(models.Subjects.SubjectCode == subject_code).first()
-        if not subject:
-            raise HTTPException(status_code=404, detail=f"Alias not found for Subject Code {subject_code}")
-    elif alias:
-        subject = db.query(models.Subjects).filter(models.Subjects.Alias == alias).first()
-        if not subject:
-            raise HTTPException(status_code=404, detail=f"Subject not found for Alias {alias}")
-    elif subject_name:
-        subject = db.query(models.Subjects).filter(models.Subjects.SubjectName == subject_name).first()
-        if not subject:
-            raise HTTPException(status_code=404, detail=f"Subject not found for Subject Name {subject_name}")
-    else:
-        raise HTTPException(status_code=400, detail="Please provide subject_code, alias, or subject_name as a query parameter.")
+    subject = await find_subject(db, subject_code, alias, subject_name)
 
-    return JSONResponse({"subject_code": subject.SubjectCode, "subject_name": subject.SubjectName, "alias": subject.Alias}, status_code=status.HTTP_200_OK)
+    return JSONResponse(subject.model_dump(), status_code=status.HTTP_200_OK)
 
 @router.delete("/", responses={
     204: {
@@ -128,25 +140,13 @@ async def get_subject_details(subject_code: str = None, alias: str = None, subje
         "description": "Alias not found for the given query parameter."
     },
 })
-async def delete_subject_alias(subject_code: str = None, alias: str = None, subject_name: str = None, db: Session = Depends(database.get_db)):
+async def delete_subject_alias(subject_code: str = None, alias: str = None, subject_name: str = None, db: AsyncSession = Depends(database.get_db)):
     """Delete Alias of a Subject."""
-    if subject_code:
-        subject = db.query(models.Subjects).filter(models.Subjects.SubjectCode == subject_code).first()
-        if not subject:
-            raise HTTPException(status_code=404, detail=f"Alias not found for Subject Code {subject_code}")
-    elif alias:
-        subject = db.query(models.Subjects).filter(models.Subjects.Alias == alias).first()
-        if not subject:
-            raise HTTPException(status_code=404, detail=f"Subject not found for Alias {alias}")
-    elif subject_name:
-        subject = db.query(models.Subjects).filter(models.Subjects.SubjectName == subject_name).first()
-        if not subject:
-            raise HTTPException(status_code=404, detail=f"Subject not found for Subject Name {subject_name}")
-    else:
-        raise HTTPException(status_code=400, detail="Please provide subject_code, alias, or subject_name as a query parameter.")
+    subject = await find_subject(db, subject_code, alias, subject_name)
     
-    db.delete(subject)
-    db.commit()
+    await db.execute(delete(models.Subjects).where(models.Subjects.SubjectCode == subject.subject_code))
+    await db.commit()
+    subject_index.invalidate()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.put("/", responses={
@@ -162,12 +162,11 @@ async def delete_subject_alias(subject_code: str = None, alias: str = None, subj
         "description": "Alias not found for the given query parameter."
     },
 })
-async def update_subject_alias(data: schemas.CreateSubjectAlias, db: Session = Depends(database.get_db)):
+async def update_subject_alias(data: schemas.CreateSubjectAlias, db: AsyncSession = Depends(database.get_db)):
     """Update Alias of a Subject."""
-    subject = db.query(models.Subjects).filter(models.Subjects.SubjectCode == data.subject_code).first()
-    if not subject:
-        raise HTTPException(status_code=404, detail=f"Alias not found for Subject Code {data.subject_code}")
+    subject = await find_subject(db, subject_code=data.subject_code)
     
-    subject.Alias = data.alias
-    db.commit()
-    return JSONResponse({"subject_code": subject.SubjectCode, "subject_name": subject.SubjectName, "alias": data.alias}, status_code=status.HTTP_200_OK)
+    await db.execute(update(models.Subjects).where(models.Subjects.SubjectCode == subject.subject_code).values(Alias=data.alias))
+    await db.commit()
+    subject_index.invalidate()
+    return JSONResponse({"subject_code": subject.subject_code, "subject_name": subject.subject_name, "alias": data.alias}, status_code=status.HTTP_200_OK)
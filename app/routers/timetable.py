@@ -1,46 +1,76 @@
 # Path: app/routers/timetable.py
 # Description: This file contains routers for SRM Timetable API.
 
-import json
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict
-from app.utils.attendance_manager import AttendanceManager
+from app.utils.timetable_store import timetable_store
 from app.utils import database
+from app.config import settings
 
 router = APIRouter(tags=['TimeTable'], prefix='/timetable', dependencies=[Depends(database.get_db)])
 
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Check if the `Accept-Encoding` header allows gzip."""
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check `If-None-Match` against the timetable ETag, ignoring the encoding suffix (weak comparison)."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        tag = tag.removeprefix("W/").strip('"')
+        if tag.removesuffix("-gzip") == etag:
+            return True
+    return False
+
+def timetable_response(request: Request) -> Response:
+    """Serve the pre-encoded timetable, or 304 if the client already has it."""
+    gzipped = accepts_gzip(request.headers.get("accept-encoding", ""))
+    headers = {
+        # Gzipped and plain bodies are different representations, so they get different strong ETags
+        "ETag": f'"{timetable_store.etag}-gzip"' if gzipped else f'"{timetable_store.etag}"',
+        "Cache-Control": f"public, max-age={settings.TIMETABLE_HTTP_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+
+    if etag_matches(request.headers.get("if-none-match", ""), timetable_store.etag):
+        return Response(status_code=304, headers=headers)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(timetable_store.body_gzip, media_type="application/json", headers=headers)
+    return Response(timetable_store.body, media_type="application/json", headers=headers)
+
 @router.get("/", responses={
     200: {
         "model": Dict[str, Dict[str, str]],
         "description": "Timetable fetched successfully."
     },
+    304: {
+        "description": "Timetable did not change since the `ETag` sent in `If-None-Match`."
+    },
     401: {
         "description": "Invalid Username or Password"
     },
     503: {
-        "description": "SRM Student Portal is Down or Login Failed. Try Again Later."
+        "description": "SRM Student Portal is Down or Login Failed, or the Timetable is not fetched yet. Try Again Later."
     }
 })
-async def get_timetable(request: Request, refresh: bool = False, db: Session = Depends(database.get_db)):
-    """Get Timetable."""
+async def get_timetable(request: Request, refresh: bool = False, db: AsyncSession = Depends(database.get_db)):
+    """Get Timetable.
+
+    Responses carry an `ETag`, send it back in `If-None-Match` to get a `304 Not Modified` while the timetable is unchanged.
+    """
     if refresh:
-        # Create Attendance Manager Instance
-        am = AttendanceManager()
-        await am.login()
-
-        # Get Timetable
-        timetable = await am.get_timetable(db)
-        
-        # Update Cache
-        request.app.cached_timetable = timetable
-        with open('cache/timetable.json', 'w') as f:
-            f.write(json.dumps(timetable, indent=4))
-        
-        # Close Attendance Manager
-        await am.close()
-
-    else:
-        timetable = request.app.cached_timetable
+        # Fetch from the portal and update the cache
+        await timetable_store.refresh(db)
+
+    elif not timetable_store.ready.is_set():
+        raise HTTPException(status_code=503, detail="Timetable is not fetched yet. Try Again Later.", headers={"Retry-After": "5"})
     
-    return timetable
+    return timetable_response(request)
@@ -0,0 +1,92 @@
+# Path: app/routers/webhook.py
+# Description: This file contains routers to register webhooks that receive attendance notifications.
+
+from fastapi import APIRouter, Depends, status, HTTPException, Response, Query
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.notifications import check_user
+from app.utils import database, models, schemas
+from app.utils.webhooks import WebhookURLError, check_webhook_url
+
+router = APIRouter(
+    prefix='/webhooks',
+    tags=['Webhooks']
+)
+
+def webhook_target(target: models.WebhookTargets) -> schemas.ResponseWebhookTarget:
+    return schemas.ResponseWebhookTarget(
+        id=target.Id,
+        username=target.Username,
+        url=target.Url,
+        batch_size=target.BatchSize,
+    )
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.ResponseWebhookTarget)
+async def add_webhook(data: schemas.CreateWebhookTarget, db: AsyncSession = Depends(database.get_db)):
+    """Register a Webhook.
+
+    New notifications of the user are POSTed to `url` as JSON, up to `batch_size` notifications per request.
+    The host must resolve to a public address (and be on `WEBHOOK_ALLOWED_HOSTS` when that is set).
+    """
+    await check_user(db, data.username)
+    try:
+        await check_webhook_url(data.url)
+    except WebhookURLError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OSError:
+        raise HTTPException(status_code=400, detail=f"Could not resolve Webhook URL {data.url}")
+
+    target = models.WebhookTargets(Username=data.username, Url=data.url, BatchSize=data.batch_size)
+    db.add(target)
+    await db.commit()
+    return webhook_target(target)
+
+@router.get("/", response_model=list[schemas.ResponseWebhookTarget])
+async def get_webhooks(username: str = Query(default=""), db: AsyncSession = Depends(database.get_db)):
+    """Get Webhooks of a User."""
+    await check_user(db, username)
+    targets = (await db.scalars(
+        select(models.WebhookTargets).where(models.WebhookTargets.Username == username).order_by(models.WebhookTargets.Id)
+    )).all()
+    return [webhook_target(target) for target in targets]
+
+@router.delete("/{target_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_webhook(target_id: int, username: str = Query(default=""), db: AsyncSession = Depends(database.get_db)):
+    """Delete a Webhook."""
+    deleted = (await db.execute(
+        delete(models.WebhookTargets)
+        .where(models.WebhookTargets.Id == target_id, models.WebhookTargets.Username == username)
+        .returning(models.WebhookTargets.Id)
+    )).first()
+    if deleted is None:
+        raise HTTPException(status_code=404, detail=f"Webhook {target_id} not found")
+    await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/dead-letters", response_model=list[schemas.ResponseWebhookDeadLetter])
+async def get_webhook_dead_letters(
+    username: str = Query(default=""),
+    limit: int = Query(default=50, ge=1, le=500),
+    db: AsyncSession = Depends(database.get_db),
+):
+    """Get the latest Webhook requests of a User that could not be delivered."""
+    await check_user(db, username)
+    dead_letters = (await db.scalars(
+        select(models.WebhookDeadLetters)
+        .join(models.WebhookTargets, models.WebhookTargets.Id == models.WebhookDeadLetters.TargetId)
+        .where(models.WebhookTargets.Username == username)
+        .order_by(models.WebhookDeadLetters.Id.desc())
+        .limit(limit)
+    )).all()
+    return [
+        schemas.ResponseWebhookDeadLetter(
+            id=dead_letter.Id,
+            target_id=dead_letter.TargetId,
+            url=dead_letter.Url,
+            payload=dead_letter.Payload,
+            attempts=dead_letter.Attempts,
+            last_error=dead_letter.LastError,
+        )
+        for dead_letter in dead_letters
+    ]
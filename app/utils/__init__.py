@@ -1,2 +1,21 @@
 # Path: app/utils/__init__.py
 # Description: This file contains some utility functions for the application.
+
+import os
+import tempfile
+
+
+def atomic_write(path: str, data: str | bytes) -> None:
+    """Write a file atomically (temp file in the same directory + rename), so readers never see a partial file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,239 @@
+# Path: app/utils/attendance_diff.py
+# Description: Turns new attendance snapshots into present/absent notification events, for many users at once.
+
+import asyncio
+import datetime
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.orm import aliased
+
+from app.logging import logger
+from app.config import settings
+from app.utils import database, models
+from app.utils.data_models import NotificationModel
+from app.utils.snapshot_store import save_snapshot
+from app.utils.notifications import notifications
+
+# Called with every batch of events the diff engine produces
+DiffListener = Callable[[list[NotificationModel]], Awaitable[None]]
+
+
+def diff_query(snapshots: list[tuple[str, datetime.datetime]]):
+    """Compare each of the given `(username, captured_at)` snapshots with the previous snapshot of the
+    same user and subject, in one query.
+
+    Only the batched snapshots and the one snapshot before each of them are read (index lookups on
+    `ix_attendance_snapshots_user_time` and `ix_attendance_snapshots_user_subject_time`), so the cost does
+    not grow with a user's snapshot history. Only subjects whose max hours changed are returned, with the
+    deltas computed by the database.
+    """
+    latest = aliased(models.AttendanceSnapshots, name="latest")
+    previous = aliased(models.AttendanceSnapshots, name="previous")
+    earlier = aliased(models.AttendanceSnapshots, name="earlier")
+    previous_captured_at = (
+        select(func.max(earlier.CapturedAt))
+        .where(
+            earlier.Username == latest.Username,
+            earlier.SubjectCode == latest.SubjectCode,
+            earlier.CapturedAt < latest.CapturedAt,
+        )
+        .scalar_subquery()
+    )
+    return (
+        select(
+            latest.Username,
+            latest.SubjectCode,
+            latest.SubjectName,
+            (latest.MaxHours - previous.MaxHours).label("MaxHoursDelta"),
+            (latest.AttendedHours - previous.AttendedHours).label("PresentDelta"),
+            (latest.AbsentHours - previous.AbsentHours).label("AbsentDelta"),
+            previous.TotalPercentage.label("PreviousTotalPercentage"),
+            latest.TotalPercentage,
+            previous.CapturedAt.label("PreviousCapturedAt"),
+            latest.CapturedAt,
+        )
+        .join(previous, and_(
+            previous.Username == latest.Username,
+            previous.SubjectCode == latest.SubjectCode,
+            previous.CapturedAt == previous_captured_at,
+        ))
+        .where(
+            tuple_(latest.Username, latest.CapturedAt).in_(snapshots),
+            latest.MaxHours != previous.MaxHours,
+        )
+    )
+
+
+def notification_events(row) -> list[NotificationModel]:
+    """Build the absent/present events of one changed subject."""
+    if row.PresentDelta + row.AbsentDelta != row.MaxHoursDelta:
+        logger.warning(f"Invalid attendance data for {row.Username} in {row.SubjectCode}, skipping notifications")
+        return []
+
+    events = []
+    for kind, num_lectures in (("absent", row.AbsentDelta), ("present", row.PresentDelta)):
+        if num_lectures > 0:
+            events.append(NotificationModel(
+                username=row.Username,
+                subject_code=row.SubjectCode,
+                subject=row.SubjectName,
+                type=kind,
+                num_lectures=num_lectures,
+                previous_attendance_percentage=row.PreviousTotalPercentage,
+                current_attendance_percentage=row.TotalPercentage,
+                previous_captured_at=row.PreviousCapturedAt,
+                current_captured_at=row.CapturedAt,
+                previous_date=row.PreviousCapturedAt.strftime("%d-%m-%Y"),
+                previous_time=row.PreviousCapturedAt.strftime("%H:%M:%S"),
+                current_date=row.CapturedAt.strftime("%d-%m-%Y"),
+                current_time=row.CapturedAt.strftime("%H:%M:%S"),
+            ))
+    return events
+
+
+class AttendanceDiffEngine:
+    """Collects newly stored snapshots and diffs them in batches.
+
+    Each batch is one query (`diff_query`: a join of every batched snapshot with its previous snapshot,
+    found by a correlated `max(CapturedAt)` subquery), no matter how many users and subjects it has, and
+    its events are handed to the listeners in one call.
+
+    A batch that keeps failing (`max_attempts` flushes in a row) is retried in halves, so a bad snapshot
+    is narrowed down and dropped without holding back the others. At most `max_pending` snapshots are queued.
+    """
+    def __init__(
+        self,
+        batch_size: int = settings.DIFF_BATCH_SIZE,
+        flush_interval: float = settings.DIFF_FLUSH_SECONDS,
+        max_attempts: int = settings.DIFF_MAX_ATTEMPTS,
+        max_pending: int = settings.DIFF_MAX_PENDING,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+
+        self.listeners: list[DiffListener] = []
+        self._pending: list[tuple[str, datetime.datetime]] = []
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        # Failed flushes of the batch at the head of the queue
+        self._attempts = 0
+        # Queued snapshots from a batch that kept failing, diffed `_split_size` at a time
+        self._suspect = 0
+        self._split_size = batch_size
+
+        # Metrics
+        self.batches = 0
+        self.snapshots = 0
+        self.events = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def add_listener(self, listener: DiffListener) -> None:
+        """Call `listener` with every batch of notification events (e.g. to store them)."""
+        self.listeners.append(listener)
+
+    def add(self, username: str, captured_at: datetime.datetime) -> None:
+        """Queue a stored snapshot for the next batch."""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            logger.warning(f"Attendance diff queue is full ({self.max_pending}), not diffing snapshot of {username} at {captured_at}")
+            return
+        self._pending.append((username, captured_at))
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+
+    async def on_sync(self, username: str, attendance: list[dict]) -> None:
+        """Sync engine hook, stores the snapshot and queues it if anything changed."""
+        captured_at = await save_snapshot(username, attendance)
+        if captured_at is not None:
+            self.add(username, captured_at)
+
+    async def diff(self, snapshots: list[tuple[str, datetime.datetime]]) -> list[NotificationModel]:
+        """Notification events for the given `(username, captured_at)` snapshots."""
+        async with database.Session() as db:
+            rows = (await db.execute(diff_query(snapshots))).all()
+        return [event for row in rows for event in notification_events(row)]
+
+    async def flush(self) -> list[NotificationModel]:
+        """Diff every queued snapshot and hand the events to the listeners."""
+        self._full.clear()
+        events = []
+        while self._pending:
+            # The batch stays queued until it is diffed and every listener took its events, so a failure is
+            # retried on the next flush (storing notifications is idempotent). New snapshots are only appended.
+            batch = self._pending[:self._split_size if self._suspect else self.batch_size]
+            try:
+                batch_events = await self.diff(batch)
+                if batch_events:
+                    for listener in self.listeners:
+                        await listener(batch_events)
+            except Exception as e:
+                self.failures += 1
+                self._attempts += 1
+                if self._attempts < self.max_attempts:
+                    raise
+                self._attempts = 0
+                if len(batch) > 1:
+                    self._suspect, self._split_size = len(batch), (len(batch) + 1) // 2
+                    logger.warning(f"Diffing {len(batch)} snapshots failed {self.max_attempts} times, retrying in batches of {self._split_size}: {e}")
+                else:
+                    username, captured_at = batch[0]
+                    logger.error(f"Error in diffing snapshot of {username} at {captured_at} after {self.max_attempts} attempts, dropping it: {e}")
+                    del self._pending[:1]
+                    self._suspect = max(0, self._suspect - 1)
+                    self.dropped += 1
+                continue
+
+            del self._pending[:len(batch)]
+            self._attempts = 0
+            self._suspect = max(0, self._suspect - len(batch))
+            self.batches += 1
+            self.snapshots += len(batch)
+            self.events += len(batch_events)
+            events.extend(batch_events)
+        return events
+
+    async def _flusher(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error in diffing attendance snapshots: {e}")
+
+    def stats(self) -> dict[str, int]:
+        """Queue length, diff counters and dropped snapshots."""
+        return {
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "snapshots": self.snapshots,
+            "events": self.events,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+    def start(self) -> None:
+        """Start diffing queued snapshots in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flusher())
+
+    async def stop(self) -> None:
+        """Stop the background task and diff what is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error in diffing attendance snapshots: {e}")
+
+
+diff_engine = AttendanceDiffEngine()
+diff_engine.add_listener(notifications.push_notifications)
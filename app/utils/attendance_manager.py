@@ -1,246 +1,295 @@
 # Path: app/utils/attendance_manager.py
 # Description: SRM Student Portal Attendance Manager API Interface.
 
-from io import BytesIO, StringIO
-from bs4 import BeautifulSoup
-from PIL import Image as PILImage
-import pandas as pd
-import pytesseract
 import httpx
-import ast
+import time
 import asyncio
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 from app.logging import logger
 from app.config import settings
-from app.utils import models
-
-SRM_STUDENT_PORTAL_URI = "https://sp.srmist.edu.in/srmiststudentportal/students/loginManager/youLogin.jsp"
-SRM_STUDENT_PORTAL_GET_CAPTCHA_URI = "https://sp.srmist.edu.in/srmiststudentportal/captchas"
-ATTENDANCE_PAGE_URI = "https://sp.srmist.edu.in/srmiststudentportal/students/report/studentAttendanceDetails.jsp"
-MONTHLY_ATTENDANCE_PAGE_URI = "https://sp.srmist.edu.in/srmiststudentportal/students/report/studentAttendanceDetailsInner.jsp"
-TIMETABLE_PAGE_URI = "https://sp.srmist.edu.in/srmiststudentportal/students/report/studentTimeTableDetails.jsp"
+from app.utils.subject_index import subject_index
+from app.utils.ocr import ocr_pool
+from app.utils.http_client import portal_http
+from app.utils.monthly_absent_cache import monthly_absent_cache
+from app.utils.legend_cache import legend_cache
+from app.utils.metrics import portal_stage_seconds, portal_login_attempts, portal_session_expired
+from app.utils.portal_pages import (
+    parse_attendance_page,
+    attendance_months,
+    parse_monthly_absent_page,
+    parse_timetable_page,
+    build_timetable,
+)
+
+PORTAL_BASE_URL = settings.PORTAL_BASE_URL.rstrip("/")
+SRM_STUDENT_PORTAL_URI = f"{PORTAL_BASE_URL}/students/loginManager/youLogin.jsp"
+SRM_STUDENT_PORTAL_GET_CAPTCHA_URI = f"{PORTAL_BASE_URL}/captchas"
+ATTENDANCE_PAGE_URI = f"{PORTAL_BASE_URL}/students/report/studentAttendanceDetails.jsp"
+MONTHLY_ATTENDANCE_PAGE_URI = f"{PORTAL_BASE_URL}/students/report/studentAttendanceDetailsInner.jsp"
+TIMETABLE_PAGE_URI = f"{PORTAL_BASE_URL}/students/report/studentTimeTableDetails.jsp"
 
 class AttendanceManager:
     """SRM Student Portal Attendance Manager API Interface."""
     def __init__(self, username: str = settings.SRM_PORTAL_USERNAME, password: str = settings.SRM_PORTAL_PASSWORD) -> None:
         self.username = username
         self.password = password
-        self.client = httpx.AsyncClient()
+        self.client = portal_http.client()
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
         }
 
-    async def login(self) -> None:
-        """Login to SRM Student Portal."""
+        # Session State (used by `SessionPool` to decide when to login again)
+        self.logged_in_at: float | None = None
+        self.last_active_at: float | None = None
+        self._login_generation = 0
+        self._login_lock = asyncio.Lock()
+
+    async def _login_attempt(self, client: httpx.AsyncClient) -> bool:
+        """Make one captcha + login attempt on `client`. Returns `False` if the captcha was wrong."""
         # Make GET request to SRM Student Portal
-        await self.client.get(SRM_STUDENT_PORTAL_URI, headers=self.headers)
+        with portal_stage_seconds.time("login_page"):
+            await client.get(SRM_STUDENT_PORTAL_URI, headers=self.headers)
 
         # Get Captcha
-        captcha_response = await self.client.get(
-            SRM_STUDENT_PORTAL_GET_CAPTCHA_URI, headers=self.headers
-        )
-        captcha_text = pytesseract.image_to_string(
-            PILImage.open(BytesIO(captcha_response.content))
-        ).strip()
+        with portal_stage_seconds.time("captcha_fetch"):
+            captcha_response = await client.get(
+                SRM_STUDENT_PORTAL_GET_CAPTCHA_URI, headers=self.headers
+            )
+        with portal_stage_seconds.time("captcha_ocr"):
+            captcha_text = await ocr_pool.solve(captcha_response.content)
+        if not captcha_text:
+            return False
 
         # Login
-        response = await self.client.post(
-            SRM_STUDENT_PORTAL_URI,
-            data={
-                "txtPageAction": "1",
-                "txtAN": self.username,
-                "txtSK": self.password,
-                "hdnCaptcha": captcha_text,
-            }
-        )
+        with portal_stage_seconds.time("login_post"):
+            response = await client.post(
+                SRM_STUDENT_PORTAL_URI,
+                headers=self.headers,
+                data={
+                    "txtPageAction": "1",
+                    "txtAN": self.username,
+                    "txtSK": self.password,
+                    "hdnCaptcha": captcha_text,
+                }
+            )
         
         # Check for Login Error
         if "Login Error : Invalid net id or password" in response.text:
             logger.warning(f"Invalid Username or Password")
             raise HTTPException(status_code=401, detail="Invalid Username or Password")
 
-        # Check for Captcha Error, If so then try again
+        # Check for Captcha Error
         if "Invalid Captcha...." in response.text:
-            logger.warning(f"Invalid Captcha, Trying Again...")
-            await self.login()
+            return False
             
         # Check status code
         # status should be `302` because after successful login it redirects to another page 
         if response.status_code != 302:
             logger.error(f"Login Failed. Status Code: {response.status_code}")
             raise HTTPException(status_code=503, detail="SRM Student Portal is Down or Login Failed. Try Again Later.")
-        
-    async def attendance_page(self) -> BeautifulSoup:
-        """Get Attendance Page."""
-        # Make GET request to Attendance Page
-        response = await self.client.post(ATTENDANCE_PAGE_URI, headers=self.headers)
 
-        # Parse HTML
-        attendance_page = BeautifulSoup(response.text, "html.parser")
+        return True
+
+    async def _race_login_attempts(self, count: int) -> bool:
+        """Run `count` login attempts at once, each with its own cookie jar, and keep the first one that succeeds.
+
+        Invalid credentials end the race at once. Other errors (e.g. a portal timeout) only fail their own attempt,
+        and are raised only when every attempt failed with an error.
+        """
+        clients = [self.client] + [portal_http.client() for _ in range(count - 1)]
+        tasks = {asyncio.create_task(self._login_attempt(client)): client for client in clients}
+        try:
+            pending, errors = set(tasks), []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is not None:
+                        if isinstance(error, HTTPException) and error.status_code == 401:
+                            raise error
+                        logger.warning(f"Login attempt failed: {type(error).__name__}: {error}")
+                        errors.append(error)
+                    elif task.result():
+                        # Continue with the cookies of the winning attempt
+                        if tasks[task] is not self.client:
+                            self.client.cookies = tasks[task].cookies
+                        return True
+            if len(errors) == len(tasks):
+                raise errors[-1]
+            return False
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for client in clients[1:]:
+                await client.aclose()
+
+    async def login(self) -> None:
+        """Login to SRM Student Portal.
+
+        Wrong captcha reads are retried up to `LOGIN_MAX_ATTEMPTS` times within `LOGIN_DEADLINE_SECONDS`.
+        With `LOGIN_RACE_ATTEMPTS` > 1, that many attempts run at once and the first success wins.
+        """
+        attempts, result = 0, "error"
+        started_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(settings.LOGIN_DEADLINE_SECONDS):
+                while attempts < settings.LOGIN_MAX_ATTEMPTS:
+                    count = min(settings.LOGIN_RACE_ATTEMPTS, settings.LOGIN_MAX_ATTEMPTS - attempts)
+                    attempts += count
+
+                    if count > 1:
+                        success = await self._race_login_attempts(count)
+                    else:
+                        success = await self._login_attempt(self.client)
+
+                    if success:
+                        result = "success"
+                        break
+
+                    logger.warning(f"Invalid Captcha ({attempts}/{settings.LOGIN_MAX_ATTEMPTS}), Trying Again...")
+                    self.client.cookies.clear()
+
+                else:
+                    result = "captcha_failed"
+                    logger.error(f"Login Failed. Captcha not solved in {attempts} attempts")
+                    raise HTTPException(status_code=503, detail="Could not solve SRM Student Portal captcha. Try Again Later.")
+
+        except TimeoutError:
+            result = "timeout"
+            logger.error(f"Login Failed. Deadline of {settings.LOGIN_DEADLINE_SECONDS}s exceeded after {attempts} attempts")
+            raise HTTPException(status_code=503, detail="SRM Student Portal Login Timed Out. Try Again Later.")
+
+        except HTTPException as e:
+            if e.status_code == 401:
+                result = "invalid_credentials"
+            raise
+
+        finally:
+            portal_login_attempts.observe(attempts, result)
+            portal_stage_seconds.observe(time.perf_counter() - started_at, "login")
+
+        # Mark Session as Logged In
+        self.logged_in_at = self.last_active_at = time.monotonic()
+        self._login_generation += 1
+
+    async def relogin(self, generation: int | None = None) -> None:
+        """Login again, unless another coroutine already did since `generation`."""
+        async with self._login_lock:
+            if generation is not None and generation != self._login_generation:
+                return
+            self.client.cookies.clear()
+            await self.login()
+
+    @staticmethod
+    def is_session_expired(response: httpx.Response) -> bool:
+        """Check if the portal sent us back to the login page instead of the requested page."""
+        if response.is_redirect:
+            return "youLogin.jsp" in response.headers.get("location", "youLogin.jsp")
+        return 'name="txtAN"' in response.text
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        """POST to a portal page, logging in again once if the session has expired."""
+        generation = self._login_generation
+        response = await self.client.post(url, headers=self.headers, **kwargs)
+
+        if self.is_session_expired(response):
+            portal_session_expired.inc()
+            logger.info(f"Portal Session Expired for {self.username}, Logging In Again...")
+            await self.relogin(generation)
+            response = await self.client.post(url, headers=self.headers, **kwargs)
+
+        self.last_active_at = time.monotonic()
+        return response
 
-        return attendance_page
+    async def attendance_page(self) -> httpx.Response:
+        """Get Attendance Page."""
+        # Make GET request to Attendance Page
+        with portal_stage_seconds.time("attendance_page"):
+            return await self._post(ATTENDANCE_PAGE_URI)
 
     async def get_monthly_absent_details(self, month: str, year: str) -> list[dict[str, str | int]]:
         """Get Monthly Absent Details."""
-        response = await self.client.post(
-            MONTHLY_ATTENDANCE_PAGE_URI,
-            data={
-                "ids": 1,
-                "attendanceMonth": month,
-                "attendanceYear": year,
-            },
-        )
-        absent_details = pd.read_html(StringIO(str(response.text)))[0]
-        return ast.literal_eval(absent_details.to_json(orient="records"))
+        with portal_stage_seconds.time("monthly_page"):
+            response = await self._post(
+                MONTHLY_ATTENDANCE_PAGE_URI,
+                data={
+                    "ids": 1,
+                    "attendanceMonth": month,
+                    "attendanceYear": year,
+                },
+            )
+        with portal_stage_seconds.time("monthly_parse"):
+            return parse_monthly_absent_page(response.content)
 
     async def get_attendance_details(self) -> list[dict[str, str | int]]:
         """Get main Attendance Table."""
         attendance_page = await self.attendance_page()
-
-        # Get Attendance Table
-        attendance_table = attendance_page.find_all("table", class_="table")[0]
-
-        # Convert to DataFrame
-        attendance_df = pd.read_html(StringIO(str(attendance_table)))[0]
-
-        # Remove Unwanted Subject Codes
-        blacklist_codes = ["CL", "Total"]
-        attendance_df = attendance_df[~attendance_df["Code"].isin(blacklist_codes)]
+        with portal_stage_seconds.time("attendance_parse"):
+            attendance, cumulative_attendance = parse_attendance_page(attendance_page.content)
 
         """Get Absent Details for every month."""
-
-        # Get Cumulative Attendance Table
-        cumulative_attendance_table = attendance_page.find_all("table", class_="table")[
-            1
+        month_year = attendance_months(cumulative_attendance)
+        signatures = [monthly_absent_cache.signature(row) for row in cumulative_attendance]
+
+        # Closed months whose counts did not change come from the cache
+        await monthly_absent_cache.load(self.username)
+        monthly_details = [
+            monthly_absent_cache.get(self.username, month, year, signature)
+            for (month, year), signature in zip(month_year, signatures)
         ]
-        cumulative_attendance_df = pd.read_html(
-            StringIO(str(cumulative_attendance_table))
-        )[0]
-        month_map = {
-            "JAN": 1,
-            "FEB": 2,
-            "MAR": 3,
-            "APR": 4,
-            "MAY": 5,
-            "JUN": 6,
-            "JUL": 7,
-            "AUG": 8,
-            "SEP": 9,
-            "OCT": 10,
-            "NOV": 11,
-            "DEC": 12,
-        }
+        missing = [idx for idx, details in enumerate(monthly_details) if details is None]
+
+        # run `get_monthly_absent_details` for every other month parallelly
+        with portal_stage_seconds.time("monthly_fanout"):
+            fetched = await asyncio.gather(
+                *[
+                    self.get_monthly_absent_details(*month_year[idx])
+                    for idx in missing
+                ]
+            )
+        stored = False
+        for idx, details in zip(missing, fetched):
+            monthly_details[idx] = details
+            stored |= monthly_absent_cache.put(self.username, *month_year[idx], signatures[idx], details)
+        if stored:
+            await monthly_absent_cache.save(self.username)
 
-        month_year = []
-        for _, row in cumulative_attendance_df.iterrows():
-            mon, year = row["Month / Year"].split(" / ")
-            month_year.append((month_map[mon], year))
-
-        # run `get_monthly_absent_details` for every month and year parallelly
-        daywise_absent_details = await asyncio.gather(
-            *[
-                self.get_monthly_absent_details(month, year)
-                for month, year in month_year
-            ]
-        )
         daywise_absent_details = [
-            item for sublist in daywise_absent_details for item in sublist
+            item for sublist in monthly_details for item in sublist
         ]
 
-        return (
-            ast.literal_eval(attendance_df.to_json(orient="records")),
-            daywise_absent_details,
-        )
+        return attendance, daywise_absent_details
 
-    async def get_timetable(self, db: Session) -> dict[str, dict[str, str]]:
+    async def get_timetable(self, db: AsyncSession) -> dict[str, dict[str, str]]:
         """Get Timetable."""
-        response = await self.client.post(TIMETABLE_PAGE_URI)
-        soup = BeautifulSoup(response.text, "html.parser")
-        timetable, legends = soup.findAll("table", class_="table")
-        timetable = pd.read_html(StringIO(str(timetable)))[0]
-        legends = pd.read_html(StringIO(str(legends)))[0]
-
-        # Clean the timetable dataframe
-        timetable.replace("-", pd.NA, inplace=True)
-        timetable.columns = timetable.columns.droplevel(0)
-        timetable.rename(columns={"Day order": "Day"}, inplace=True)
-
-        # Clean the legends dataframe
-        legends.rename(
-            columns={"Code": "SubCode", "Description": "SubName"}, inplace=True
-        )
-
-        # Create a map of subject name to subject code
-        sub_map = {}
-        for data in legends.to_dict(orient='records'):
-            res = db.query(models.Subjects).filter(models.Subjects.SubjectCode == data['SubCode'].strip()).first()
-            if res:
-                sub_map[res.SubjectCode] = res.Alias
-            else:
-                sub_map[data['SubCode'].strip()] = data['SubName'].strip()
-
-        # Replace the subject name with subject code in the timetable dataframe
-        for idx, row in timetable.iterrows():
-            for col in timetable.columns:
-                # If there is a single subject code in the cell
-                if row[col] in sub_map:
-                    timetable.at[idx, col] = sub_map[row[col]]
-
-                # For electives where there are multiple subject codes
-                elif isinstance(row[col], str) and len(row[col].split(" ")) > 1:
-                    sub_codes = row[col].split(" ")
-                    sub_names = [sub_map[sub_code] for sub_code in sub_codes]
-                    timetable.at[idx, col] = " / ".join(sub_names)
-
-        class_time = [
-            "Day",
-            "9:20-10:10",
-            "10:10-11:00",
-            "11:10-12:00",
-            "12:00-12:50",
-            "2:00-2:50",
-            "2:50-3:40",
-            "3:40-4:30",
-        ]
-
-        timetable.drop("04:00-04:50", axis=1, inplace=True)
-        timetable.columns = class_time
-        timetable.drop(5, inplace=True)
-
-        new_timetable = {}
-        for item in timetable.to_dict(orient="records"):
-            day = ""
-            for key, value in item.items():
-                if key == "Day":
-                    day = value
-                    new_timetable[day] = {}
-                else:
-                    new_timetable[day][key] = value
+        with portal_stage_seconds.time("timetable_page"):
+            response = await self._post(TIMETABLE_PAGE_URI)
+        with portal_stage_seconds.time("timetable_parse"):
+            timetable, legends = parse_timetable_page(response.content)
+        await legend_cache.update(legends)
+
+        # Create a map of subject code to subject alias (or name, if it has no alias)
+        subjects = (await subject_index.ensure_loaded(db)).by_code
+        sub_map = {
+            sub_code: subjects[sub_code].alias if sub_code in subjects else sub_name
+            for sub_code, sub_name in legends.items()
+        }
 
-        return new_timetable
+        with portal_stage_seconds.time("timetable_build"):
+            return build_timetable(timetable, sub_map)
 
     async def get_subject_name_from_subject_code_from_timetable_page(self, subject_code: str) -> str:
         """Get Subject Name from Subject Code from Timetable Page."""
-        response = await self.client.post(TIMETABLE_PAGE_URI)
-        soup = BeautifulSoup(response.text, "html.parser")
-        legends = soup.findAll("table", class_="table")[1]
-        legends = pd.read_html(StringIO(str(legends)))[0]
-
-        # Clean the legends dataframe
-        legends.rename(
-            columns={"Code": "SubCode", "Description": "SubName"}, inplace=True
-        )
-
-        # Create a map of subject name to subject code
-        sub_map = {
-            data["SubCode"].strip(): data["SubName"].strip()
-            for data in legends.to_dict(orient="records")
-        }
+        response = await self._post(TIMETABLE_PAGE_URI)
+        _, legends = parse_timetable_page(response.content)
+        await legend_cache.update(legends)
 
-        return sub_map.get(subject_code, None)
+        return legends.get(subject_code, None)
     
     async def close(self) -> None:
-        """Close HTTP client."""
+        """Close HTTP client (the shared connection pool stays open)."""
         await self.client.aclose()
@@ -0,0 +1,112 @@
+# Path: app/utils/cache.py
+# Description: In-memory TTL cache with stale-while-revalidate and single-flight fetching for async producers.
+
+import time
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from app.logging import logger
+from app.config import settings
+
+
+class AsyncTTLCache:
+    """Caches results of async fetches per key.
+
+    - Entries younger than `ttl` are served as is.
+    - Entries younger than `ttl + stale_ttl` are served as is while one background fetch refreshes them.
+    - Concurrent misses for the same key share one fetch, and every waiter gets its result (or its error).
+    """
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, max_size: int = 1024) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+        # Metrics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Get cached value for `key`, calling `fetch` only when there is no usable entry."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                self.hits += 1
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._single_flight(key, fetch)
+                return value
+
+        self.misses += 1
+        # Shield, so one waiter going away does not cancel the fetch for everyone else
+        return await asyncio.shield(self._single_flight(key, fetch))
+
+    def _single_flight(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Return the running fetch for `key`, or start one."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        task = asyncio.create_task(self._fetch(key, fetch))
+        task.add_done_callback(self._log_error)
+        self._inflight[key] = task
+        return task
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        finally:
+            self._inflight.pop(key, None)
+
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return value
+
+    def _log_error(self, task: asyncio.Task) -> None:
+        # Also marks the exception as retrieved for background refreshes nobody awaits
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+            logger.error(f"Error in fetching {self.name} cache entry: {task.exception()}")
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the cached value for `key`."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every cached value."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """Cache size, settings and hit/miss counters."""
+        return {
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
+
+
+attendance_cache = AsyncTTLCache(
+    "attendance",
+    ttl=settings.ATTENDANCE_CACHE_TTL,
+    stale_ttl=settings.ATTENDANCE_CACHE_STALE_TTL,
+)
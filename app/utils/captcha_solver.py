@@ -0,0 +1,210 @@
+# Path: app/utils/captcha_solver.py
+# Description: Pluggable captcha solvers for the SRM Student Portal login captcha.
+
+from __future__ import annotations
+
+import os
+from abc import ABC, abstractmethod
+from io import BytesIO
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from app.logging import logger
+from app.config import settings
+
+# numpy, PIL and pytesseract (which pulls in pandas when installed) are imported on first use,
+# so importing the app does not pay for them
+if TYPE_CHECKING:
+    import numpy as np
+
+GLYPH_SIZE = (20, 16)  # (height, width) every segmented glyph is scaled to
+
+
+class CaptchaSolver(ABC):
+    """Base class for captcha solvers.
+
+    `solve` returns the captcha text, or `None` if the solver is not confident about its answer.
+    """
+    name = "base"
+
+    @abstractmethod
+    def solve(self, content: bytes) -> str | None:
+        ...
+
+
+class TesseractCaptchaSolver(CaptchaSolver):
+    """General purpose OCR using the tesseract binary (spawns a process per captcha)."""
+    name = "tesseract"
+
+    def solve(self, content: bytes) -> str | None:
+        import pytesseract
+        from PIL import Image as PILImage
+
+        text = pytesseract.image_to_string(PILImage.open(BytesIO(content))).strip()
+        return text or None
+
+
+def binarize(content: bytes) -> np.ndarray:
+    """Decode image bytes into a boolean ink mask using Otsu's threshold."""
+    import numpy as np
+    from PIL import Image as PILImage
+
+    gray = np.asarray(PILImage.open(BytesIO(content)).convert("L"), dtype=np.uint8)
+
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weights = np.cumsum(histogram)
+    means = np.cumsum(histogram * np.arange(256))
+    total_weight, total_mean = weights[-1], means[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (total_mean * weights - means * total_weight) ** 2 / (weights * (total_weight - weights))
+    threshold = int(np.nanargmax(between))
+
+    ink = gray <= threshold
+    # Text is always the minority of the image, whatever its colour
+    return ink if ink.mean() <= 0.5 else ~ink
+
+
+def segment(ink: np.ndarray, min_width: int = 2, min_pixels: int = 6) -> list[np.ndarray]:
+    """Split an ink mask into glyph masks using the vertical projection profile."""
+    import numpy as np
+
+    columns = ink.sum(axis=0) > 0
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], columns.astype(np.int8), [0]))))
+    runs = [(start, end) for start, end in zip(edges[::2], edges[1::2]) if end - start >= min_width]
+    if not runs:
+        return []
+
+    # Touching glyphs show up as one wide run, split those evenly
+    median_width = float(np.median([end - start for start, end in runs]))
+    glyphs = []
+    for start, end in runs:
+        pieces = max(1, int(round((end - start) / median_width))) if median_width else 1
+        bounds = np.linspace(start, end, pieces + 1).astype(int)
+        for left, right in zip(bounds[:-1], bounds[1:]):
+            glyph = ink[:, left:right]
+            rows = np.flatnonzero(glyph.any(axis=1))
+            if rows.size and glyph.sum() >= min_pixels:
+                glyphs.append(glyph[rows[0]:rows[-1] + 1])
+    return glyphs
+
+
+def normalize(glyph: np.ndarray) -> np.ndarray:
+    """Scale a glyph mask to `GLYPH_SIZE` (nearest neighbour) and flatten it."""
+    import numpy as np
+
+    height, width = GLYPH_SIZE
+    rows = (np.arange(height) * glyph.shape[0] / height).astype(int)
+    cols = (np.arange(width) * glyph.shape[1] / width).astype(int)
+    return glyph[rows[:, None], cols].ravel().astype(np.float32)
+
+
+class TemplateCaptchaSolver(CaptchaSolver):
+    """In-process solver: binarize, segment glyphs and match each against a stored glyph set.
+
+    The glyph set is a `.npz` file with `glyphs` (N x H*W) and `labels` (N) arrays, built from
+    labelled captchas with `TemplateCaptchaSolver.build`.
+    """
+    name = "template"
+
+    def __init__(self, glyphs_path: str = settings.CAPTCHA_GLYPHS_PATH, max_distance: float = settings.CAPTCHA_MAX_DISTANCE) -> None:
+        self.glyphs_path = glyphs_path
+        self.max_distance = max_distance
+        self.glyphs: np.ndarray | None = None
+        self.labels: np.ndarray | None = None
+
+        if os.path.exists(glyphs_path):
+            import numpy as np
+
+            with np.load(glyphs_path) as data:
+                self.glyphs, self.labels = data["glyphs"], data["labels"]
+            logger.info(f"Loaded {len(self.labels)} captcha glyphs from {glyphs_path}")
+
+    def solve(self, content: bytes) -> str | None:
+        if self.glyphs is None:
+            return None
+        import numpy as np
+
+        glyphs = segment(binarize(content))
+        if not glyphs:
+            return None
+
+        # Nearest neighbour over the glyph set, distance is the fraction of differing pixels
+        samples = np.stack([normalize(glyph) for glyph in glyphs])
+        distances = np.abs(samples[:, None, :] - self.glyphs[None, :, :]).mean(axis=2)
+        nearest = distances.argmin(axis=1)
+        if distances[np.arange(len(nearest)), nearest].max() > self.max_distance:
+            return None
+
+        return "".join(self.labels[nearest])
+
+    @staticmethod
+    def build(samples: Iterable[tuple[str, bytes]], glyphs_path: str = settings.CAPTCHA_GLYPHS_PATH) -> int:
+        """Build a glyph set from `(captcha text, image bytes)` pairs and save it. Returns the glyph count.
+
+        Captchas whose segmentation does not produce one glyph per character are skipped.
+        """
+        import numpy as np
+
+        glyphs, labels = [], []
+        for text, content in samples:
+            segments = segment(binarize(content))
+            if len(segments) != len(text):
+                continue
+            glyphs.extend(normalize(glyph) for glyph in segments)
+            labels.extend(text)
+
+        if not glyphs:
+            raise ValueError("No captcha could be segmented into one glyph per character")
+
+        os.makedirs(os.path.dirname(glyphs_path) or ".", exist_ok=True)
+        np.savez_compressed(glyphs_path, glyphs=np.stack(glyphs), labels=np.array(labels))
+        return len(labels)
+
+
+class FallbackCaptchaSolver(CaptchaSolver):
+    """Tries each solver in order and returns the first confident answer."""
+    name = "fallback"
+
+    def __init__(self, *solvers: CaptchaSolver) -> None:
+        self.solvers = solvers
+        self.name = "+".join(solver.name for solver in solvers)
+
+    def solve(self, content: bytes) -> str | None:
+        for solver in self.solvers:
+            text = solver.solve(content)
+            if text:
+                return text
+        return None
+
+
+def create_captcha_solver(name: str = settings.CAPTCHA_SOLVER) -> CaptchaSolver:
+    """Create a solver by name: `template` (with tesseract fallback) or `tesseract`."""
+    if name == "tesseract":
+        return TesseractCaptchaSolver()
+    if name == "template":
+        return FallbackCaptchaSolver(TemplateCaptchaSolver(), TesseractCaptchaSolver())
+    raise ValueError(f"Unknown CAPTCHA_SOLVER {name!r}, expected 'template' or 'tesseract'")
+
+
+_solver: CaptchaSolver | None = None
+
+def solve_captcha(content: bytes) -> str:
+    """Solve captcha image bytes with the configured solver. Runs inside an OCR worker."""
+    global _solver
+    if _solver is None:
+        _solver = create_captcha_solver()
+    return _solver.solve(content) or ""
+
+
+if __name__ == "__main__":
+    # Build the glyph set from a directory of labelled captchas, e.g. `AB12C.png`
+    import sys
+    from pathlib import Path
+
+    corpus = Path(sys.argv[1])
+    output = sys.argv[2] if len(sys.argv) > 2 else settings.CAPTCHA_GLYPHS_PATH
+    count = TemplateCaptchaSolver.build(
+        ((path.stem.split("_")[0], path.read_bytes()) for path in sorted(corpus.iterdir()) if path.is_file()),
+        output,
+    )
+    print(f"Saved {count} glyphs to {output}")
@@ -0,0 +1,52 @@
+# Path: app/utils/crypto.py
+# Description: Encryption of stored secrets (portal passwords) with a key from the settings.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import String
+from sqlalchemy.types import TypeDecorator
+
+from app.config import settings
+
+# cryptography is imported on first use, so the app starts without it (and without a key) when no passwords are stored
+if TYPE_CHECKING:
+    from cryptography.fernet import MultiFernet
+
+_fernet: MultiFernet | None = None
+
+
+def fernet() -> MultiFernet:
+    """Fernet built from `PASSWORD_ENCRYPTION_KEY`. The first key encrypts, all keys decrypt, so keys can be rotated."""
+    global _fernet
+    if _fernet is None:
+        if not settings.PASSWORD_ENCRYPTION_KEY:
+            raise RuntimeError("PASSWORD_ENCRYPTION_KEY is not set, it is needed to store and read user passwords")
+        from cryptography.fernet import Fernet, MultiFernet
+
+        _fernet = MultiFernet([Fernet(key.strip()) for key in settings.PASSWORD_ENCRYPTION_KEY.split(",")])
+    return _fernet
+
+
+def encrypt(value: str) -> str:
+    return fernet().encrypt(value.encode()).decode()
+
+
+def decrypt(token: str) -> str:
+    return fernet().decrypt(token.encode()).decode()
+
+
+class EncryptedString(TypeDecorator):
+    """String column that is stored encrypted and read back as plain text.
+
+    Portal passwords cannot be hashed, since the background sync has to log in with them.
+    """
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return encrypt(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return decrypt(value) if value is not None else None
@@ -1,30 +1,35 @@
 # Path: app/utils/database.py
 # Description: Database Client for PostgreSQL.
 
-from sqlalchemy import create_engine
-from sqlalchemy_utils import create_database, database_exists
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
 
-# Create the database if it doesn't exist
-if not database_exists(settings.get_postgres_uri()):
-    create_database(settings.get_postgres_uri())
+def provision() -> None:
+    """Create the database if it doesn't exist. Blocking, called once on startup instead of on import."""
+    from sqlalchemy_utils import create_database, database_exists
 
-# Create the engine
-engine = create_engine(settings.get_postgres_uri())
+    if not database_exists(settings.get_postgres_uri()):
+        create_database(settings.get_postgres_uri())
+
+# Create the engine (connects lazily, on first use)
+engine = create_async_engine(
+    settings.get_postgres_async_uri(),
+    pool_size=settings.POSTGRES_POOL_SIZE,
+    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+    pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+    pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+    pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+)
 
 # Create the session
-Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Session = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Create the base class
 DatabaseBase = declarative_base()
 
-def get_db():
+async def get_db():
     """Get Database Session."""
-    db = Session()
-    try:
+    async with Session() as db:
         yield db
-    finally:
-        db.close()
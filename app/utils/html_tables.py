@@ -0,0 +1,132 @@
+# Path: app/utils/html_tables.py
+# Description: Streaming lxml based HTML table extractor, turns portal pages straight into typed row records.
+
+from __future__ import annotations
+
+import re
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+# lxml is imported on first parse, so importing the app does not pay for it
+if TYPE_CHECKING:
+    from lxml import etree
+
+WHITESPACE = re.compile(r"\s+")
+INTEGER = re.compile(r"[+-]?\d+")
+FLOAT = re.compile(r"[+-]?(\d+\.\d*|\.\d+|\d+)([eE][+-]?\d+)?")
+
+Cell = str | int | float | None
+
+
+def _cell_text(cell: etree._Element) -> str:
+    return WHITESPACE.sub(" ", "".join(cell.itertext())).strip()
+
+
+def _expand_rows(rows: list[etree._Element]) -> list[list[str]]:
+    """Read `td`/`th` text of each row, repeating cells that use `colspan` or `rowspan` (like `pd.read_html`)."""
+    grid: list[list[str]] = []
+    pending: dict[int, tuple[str, int]] = {}  # column -> (text, rows left) for rowspans
+
+    for row in rows:
+        values: list[str] = []
+        column = 0
+
+        def fill_rowspans() -> None:
+            nonlocal column
+            while column in pending:
+                text, left = pending[column]
+                values.append(text)
+                if left > 1:
+                    pending[column] = (text, left - 1)
+                else:
+                    del pending[column]
+                column += 1
+
+        for cell in row:
+            if cell.tag not in ("td", "th"):
+                continue
+            fill_rowspans()
+            text = _cell_text(cell)
+            colspan = int(cell.get("colspan", 1) or 1)
+            rowspan = int(cell.get("rowspan", 1) or 1)
+            for _ in range(colspan):
+                values.append(text)
+                if rowspan > 1:
+                    pending[column] = (text, rowspan - 1)
+                column += 1
+        fill_rowspans()
+        grid.append(values)
+
+    return grid
+
+
+def _column_names(header: list[str]) -> list[str]:
+    """Make duplicate column names unique the way pandas does (`Name`, `Name.1`, ...)."""
+    seen: dict[str, int] = {}
+    names = []
+    for name in header:
+        if name in seen:
+            seen[name] += 1
+            names.append(f"{name}.{seen[name]}")
+        else:
+            seen[name] = 0
+            names.append(name)
+    return names
+
+
+def _coerce_column(values: list[str]) -> list[Cell]:
+    """Convert a column to `int` or `float` if every non-empty value is numeric, empty values become `None`."""
+    present = [value for value in values if value]
+    if present and all(INTEGER.fullmatch(value) for value in present):
+        return [int(value) if value else None for value in values]
+    if present and all(FLOAT.fullmatch(value) for value in present):
+        return [float(value) if value else None for value in values]
+    return [value or None for value in values]
+
+
+def table_records(table: etree._Element, header_row: int = -1) -> list[dict[str, Cell]]:
+    """Convert a `<table>` element into a list of row dicts.
+
+    Header rows are the rows in `<thead>`, or else the leading rows made only of `<th>` cells.
+    With several header rows, `header_row` picks the one used for column names.
+    """
+    rows = list(table.iter("tr"))
+    header_rows = [row for row in rows if row.getparent().tag == "thead"]
+    if not header_rows:
+        for row in rows:
+            cells = [cell for cell in row if cell.tag in ("td", "th")]
+            if not cells or any(cell.tag != "th" for cell in cells):
+                break
+            header_rows.append(row)
+    body_rows = [row for row in rows if row not in header_rows]
+
+    headers = _expand_rows(header_rows)
+    body = [values for values in _expand_rows(body_rows) if values]
+    if headers:
+        names = _column_names(headers[header_row])
+    else:
+        names = [str(i) for i in range(max((len(values) for values in body), default=0))]
+
+    columns = [
+        _coerce_column([values[i] if i < len(values) else "" for values in body])
+        for i in range(len(names))
+    ]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def read_tables(content: bytes | str, class_name: str | None = None, header_row: int = -1) -> list[list[dict[str, Cell]]]:
+    """Parse every `<table>` (optionally only those with CSS class `class_name`) from an HTML page into row records.
+
+    The page is parsed incrementally, each table is converted as soon as it is closed and then freed.
+    """
+    from lxml import etree
+
+    if isinstance(content, str):
+        content = content.encode()
+
+    tables = []
+    for _, element in etree.iterparse(BytesIO(content), events=("end",), tag="table", html=True, recover=True):
+        if class_name is None or class_name in (element.get("class") or "").split():
+            tables.append(table_records(element, header_row))
+        element.clear(keep_tail=True)
+    return tables
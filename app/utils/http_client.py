@@ -0,0 +1,135 @@
+# Path: app/utils/http_client.py
+# Description: Shared, tuned HTTP connection pool for SRM Student Portal requests.
+
+import time
+import httpx
+
+from app.logging import logger
+from app.config import settings
+from app.utils.rate_limiter import portal_limiters
+from app.utils.metrics import portal_request_seconds, portal_responses
+
+
+class LimitedStream(httpx.AsyncByteStream):
+    """Response body that calls `on_close(healthy)` once, after it has been read and closed."""
+    def __init__(self, stream: httpx.AsyncByteStream, on_close) -> None:
+        self.stream = stream
+        self.on_close = on_close
+        self.healthy = True
+        self._closed = False
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self.stream:
+                yield chunk
+        except Exception:
+            self.healthy = False
+            raise
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self.stream.aclose()
+        finally:
+            self.on_close(self.healthy)
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """Lets many clients use one connection pool. Closing a client does not close the pool.
+
+    Every request also goes through the per-host limiter in `app.utils.rate_limiter`, and its status code and
+    response time are recorded per portal page in `app.utils.metrics`. The limiter slot is held, and the
+    response time measured, until the response body has been read and closed.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = portal_limiters.get(request.url.host)
+        await limiter.acquire()
+        page = request.url.path.rsplit("/", 1)[-1]
+        started_at = time.monotonic()
+
+        def finish(healthy: bool) -> None:
+            elapsed = time.monotonic() - started_at
+            portal_request_seconds.observe(elapsed, page)
+            limiter.release(healthy, elapsed)
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            # Timeouts and connection errors
+            portal_responses.inc(page, "error")
+            finish(False)
+            raise
+        except BaseException:
+            # Cancellations (e.g. losing login attempts) say nothing about the portal
+            finish(True)
+            raise
+
+        portal_responses.inc(page, str(response.status_code))
+        status_healthy = response.status_code < 500
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=LimitedStream(response.stream, lambda body_healthy: finish(status_healthy and body_healthy)),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        pass
+
+
+class PortalHTTP:
+    """Owns the connection pool to the portal and creates lightweight per-session clients on top of it.
+
+    Every client gets its own cookie jar, so portal sessions stay separate while TCP/TLS
+    connections are reused across all of them.
+    """
+    def __init__(self) -> None:
+        self.transport: httpx.AsyncBaseTransport | None = None
+        self.timeout = httpx.Timeout(
+            connect=settings.PORTAL_HTTP_CONNECT_TIMEOUT,
+            read=settings.PORTAL_HTTP_READ_TIMEOUT,
+            write=settings.PORTAL_HTTP_WRITE_TIMEOUT,
+            pool=settings.PORTAL_HTTP_POOL_TIMEOUT,
+        )
+
+    def start(self) -> None:
+        """Create the connection pool."""
+        if self.transport is not None:
+            return
+
+        http2 = settings.PORTAL_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("PORTAL_HTTP2 is enabled but the `h2` package is not installed, using HTTP/1.1")
+                http2 = False
+
+        self.transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.PORTAL_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PORTAL_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.PORTAL_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    def client(self) -> httpx.AsyncClient:
+        """Create a client with its own cookie jar on top of the shared connection pool."""
+        if self.transport is None:
+            self.start()
+        return httpx.AsyncClient(transport=SharedTransport(self.transport), timeout=self.timeout)
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self.transport is not None:
+            await self.transport.aclose()
+            self.transport = None
+
+
+portal_http = PortalHTTP()
@@ -0,0 +1,80 @@
+# Path: app/utils/legend_cache.py
+# Description: Cache of the portal's timetable legends table (subject code -> official subject name).
+
+import os
+import json
+import time
+import asyncio
+
+from app.logging import logger
+from app.config import settings
+from app.utils import atomic_write
+
+
+class LegendCache:
+    """Subject names from the timetable legends table, kept in memory and on disk.
+
+    It is filled as a side effect of every timetable page fetch. Entries are merged, not replaced, as
+    subject names don't change. When the cache is older than `max_age`, a miss should be checked
+    against the portal again. A miss on a fresh cache can be answered right away.
+
+    The copy on disk is read by `load` on startup, not on import, and an unreadable copy is ignored.
+    """
+    def __init__(self, path: str = settings.LEGEND_CACHE_PATH, max_age: float = settings.LEGEND_CACHE_MAX_AGE) -> None:
+        self.path = path
+        self.max_age = max_age
+        self.legends: dict[str, str] = {}
+        self.updated_at: float | None = None
+        self._write_lock = asyncio.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def _read(self) -> tuple[dict[str, str], float] | None:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r") as f:
+                data = json.loads(f.read())
+            return dict(data["legends"]), float(data["updated_at"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error in reading cached legends, starting empty: {e}")
+            return None
+
+    async def load(self) -> None:
+        """Read the legends from disk (in a thread), keeping any that were parsed meanwhile."""
+        data = await asyncio.to_thread(self._read)
+        if data is not None:
+            legends, updated_at = data
+            self.legends = {**legends, **self.legends}
+            self.updated_at = self.updated_at or updated_at
+
+    def is_fresh(self) -> bool:
+        """Check if the legends were read from the portal within `max_age` seconds."""
+        return self.updated_at is not None and time.time() - self.updated_at < self.max_age
+
+    def get(self, subject_code: str) -> str | None:
+        """Get the official subject name for a subject code."""
+        subject_name = self.legends.get(subject_code)
+        if subject_name is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return subject_name
+
+    def stats(self) -> dict[str, int | bool]:
+        """Cache size, freshness and hit/miss counters."""
+        return {"size": len(self.legends), "fresh": self.is_fresh(), "hits": self.hits, "misses": self.misses}
+
+    async def update(self, legends: dict[str, str]) -> None:
+        """Merge freshly parsed legends and write them to disk (in a thread, off the event loop)."""
+        self.legends = {**self.legends, **legends}
+        self.updated_at = time.time()
+        async with self._write_lock:
+            # Serialized under the lock, so a slower earlier write can not replace newer legends
+            data = json.dumps({"updated_at": self.updated_at, "legends": self.legends}, indent=4)
+            await asyncio.to_thread(atomic_write, self.path, data)
+
+
+legend_cache = LegendCache()
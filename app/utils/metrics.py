@@ -0,0 +1,159 @@
+# Path: app/utils/metrics.py
+# Description: Minimal in-process metrics registry (counters and histograms) rendered in the Prometheus text format.
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+# Upper bounds (seconds) of latency histogram buckets, from HTML parsing (~1 ms) to slow portal logins
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (labels, value) pairs of one metric, as returned by collectors
+Samples = Iterable[tuple[dict[str, str], float]]
+# Called on every scrape, yields (name, type, help, samples) for values that are already counted elsewhere
+Collector = Callable[[], Iterable[tuple[str, str, str, Samples]]]
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter, one value per combination of label values."""
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in self.values.items():
+            yield f"{self.name}{format_labels(dict(zip(self.labels, label_values)))} {format_value(value)}"
+
+
+class Timer:
+    """Context manager that observes the time spent in its block on a histogram."""
+    __slots__ = ("histogram", "label_values", "started_at")
+
+    def __init__(self, histogram: "Histogram", label_values: tuple[str, ...]) -> None:
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self) -> "Timer":
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started_at, *self.label_values)
+
+
+class Histogram:
+    """Histogram with fixed buckets, one series per combination of label values.
+
+    Observing is a bisect and three additions; buckets are only made cumulative when rendered.
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> [count per bucket (last one is +Inf)..., sum, count]
+        self.series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def time(self, *label_values: str) -> Timer:
+        """Time a block: `with histogram.time("label"): ...`"""
+        return Timer(self, label_values)
+
+    def samples(self) -> Iterable[str]:
+        for label_values, series in self.series.items():
+            labels = dict(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                yield f"{self.name}_bucket{format_labels({**labels, 'le': format_value(bound)})} {cumulative}"
+            yield f"{self.name}_sum{format_labels(labels)} {format_value(series[-2])}"
+            yield f"{self.name}_count{format_labels(labels)} {series[-1]}"
+
+
+class MetricsRegistry:
+    """Holds the app's metrics and renders them for `GET /metrics`.
+
+    Hot paths update `Counter`s and `Histogram`s directly. Components that already keep their own counters
+    (caches, OCR pool, rate limiters) are read by collectors on scrape instead, so they cost nothing per request.
+    """
+    def __init__(self) -> None:
+        self.metrics: list[Counter | Histogram] = []
+        self.collectors: list[Collector] = []
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        counter = Counter(name, help, labels)
+        self.metrics.append(counter)
+        return counter
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        histogram = Histogram(name, help, labels, buckets)
+        self.metrics.append(histogram)
+        return histogram
+
+    def add_collector(self, collector: Collector) -> None:
+        """Call `collector` on every scrape for metrics counted elsewhere."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.type}", *metric.samples()]
+        for collector in self.collectors:
+            for name, type, help, samples in collector():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {type}"]
+                lines += [f"{name}{format_labels(labels)} {format_value(value)}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+# SRM Student Portal
+portal_stage_seconds = metrics.histogram(
+    "portal_stage_seconds", "Time spent in each AttendanceManager stage.", ("stage",)
+)
+portal_login_attempts = metrics.histogram(
+    "portal_login_captcha_attempts", "Captcha attempts per login, by login result.", ("result",),
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15, 20),
+)
+portal_request_seconds = metrics.histogram(
+    "portal_request_seconds", "SRM Student Portal response time per page.", ("page",)
+)
+portal_responses = metrics.counter(
+    "portal_responses_total", "SRM Student Portal responses per page and status code (`error` for failed requests).", ("page", "status")
+)
+portal_session_expired = metrics.counter(
+    "portal_session_expired_total", "Portal sessions found expired on a page request, each causes a login."
+)
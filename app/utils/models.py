@@ -2,7 +2,8 @@
 # Description: This file contains the Pydantic models for the application.
 
 from app.utils.database import DatabaseBase
-from sqlalchemy import Column, Integer, String, ForeignKey, PrimaryKeyConstraint, Time, VARCHAR
+from app.utils.crypto import EncryptedString
+from sqlalchemy import Column, Integer, BigInteger, Float, Boolean, String, ForeignKey, PrimaryKeyConstraint, UniqueConstraint, Time, VARCHAR, DateTime, Index, func
 
 class Subjects(DatabaseBase):
     __tablename__ = "subjects"
@@ -11,3 +12,77 @@ class Subjects(DatabaseBase):
     SubjectName = Column(String, nullable=False)
     Alias = Column(String, nullable=False)
 
+class Users(DatabaseBase):
+    __tablename__ = "users"
+
+    Username = Column(String, nullable=False, primary_key=True)
+    Password = Column(EncryptedString, nullable=False)
+
+    # Background Attendance Sync Progress
+    NextSyncAt = Column(DateTime(timezone=True), nullable=True, index=True)
+    LastSyncedAt = Column(DateTime(timezone=True), nullable=True)
+    LastSyncStatus = Column(String, nullable=True)
+    LastSyncError = Column(String, nullable=True)
+    ConsecutiveFailures = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Hash of the last stored attendance snapshot, used to skip unchanged snapshots
+    SnapshotHash = Column(VARCHAR(64), nullable=True)
+
+class AttendanceSnapshots(DatabaseBase):
+    __tablename__ = "attendance_snapshots"
+    __table_args__ = (
+        Index("ix_attendance_snapshots_user_subject_time", "Username", "SubjectCode", "CapturedAt"),
+        Index("ix_attendance_snapshots_user_time", "Username", "CapturedAt"),
+    )
+
+    Id = Column(BigInteger, primary_key=True, autoincrement=True)
+    Username = Column(String, ForeignKey("users.Username", ondelete="CASCADE"), nullable=False)
+    SubjectCode = Column(VARCHAR(10), nullable=False)
+    SubjectName = Column(String, nullable=False)
+    MaxHours = Column(Integer, nullable=False)
+    AttendedHours = Column(Integer, nullable=False)
+    AbsentHours = Column(Integer, nullable=False)
+    TotalPercentage = Column(Float, nullable=False)
+    CapturedAt = Column(DateTime(timezone=True), nullable=False)
+
+class Notifications(DatabaseBase):
+    __tablename__ = "notifications"
+    __table_args__ = (
+        # Same change of the same subject is only notified once
+        UniqueConstraint("Username", "SubjectCode", "Type", "CapturedAt", name="uq_notifications_event"),
+        Index("ix_notifications_user_read", "Username", "Read", "Id"),
+    )
+
+    Id = Column(BigInteger, primary_key=True, autoincrement=True)
+    Username = Column(String, ForeignKey("users.Username", ondelete="CASCADE"), nullable=False)
+    SubjectCode = Column(VARCHAR(10), nullable=False)
+    Subject = Column(String, nullable=False)
+    Type = Column(VARCHAR(10), nullable=False)
+    NumLectures = Column(Integer, nullable=False)
+    PreviousAttendancePercentage = Column(Float, nullable=False)
+    CurrentAttendancePercentage = Column(Float, nullable=False)
+    PreviousCapturedAt = Column(DateTime(timezone=True), nullable=False)
+    CapturedAt = Column(DateTime(timezone=True), nullable=False)
+    Read = Column(Boolean, nullable=False, default=False, server_default="false")
+    CreatedAt = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+class WebhookTargets(DatabaseBase):
+    __tablename__ = "webhook_targets"
+
+    Id = Column(Integer, primary_key=True, autoincrement=True)
+    Username = Column(String, ForeignKey("users.Username", ondelete="CASCADE"), nullable=False, index=True)
+    Url = Column(String, nullable=False)
+    # Notifications per request, 1 sends every notification on its own
+    BatchSize = Column(Integer, nullable=False, default=1, server_default="1")
+    CreatedAt = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+class WebhookDeadLetters(DatabaseBase):
+    __tablename__ = "webhook_dead_letters"
+
+    Id = Column(BigInteger, primary_key=True, autoincrement=True)
+    TargetId = Column(Integer, ForeignKey("webhook_targets.Id", ondelete="CASCADE"), nullable=False, index=True)
+    Url = Column(String, nullable=False)
+    Payload = Column(String, nullable=False)
+    Attempts = Column(Integer, nullable=False)
+    LastError = Column(String, nullable=True)
+    CreatedAt = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
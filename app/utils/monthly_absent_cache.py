@@ -0,0 +1,104 @@
+# Path: app/utils/monthly_absent_cache.py
+# Description: Persistent cache of absent records of closed months, so only changed months are fetched from the portal again.
+
+import os
+import re
+import json
+import asyncio
+import datetime
+from collections import OrderedDict
+
+from app.config import settings
+from app.utils import atomic_write
+
+
+class MonthlyAbsentCache:
+    """Stores absent records per (account, month, year) in one JSON file per account.
+
+    Only closed months (before the current month) are stored. Each entry keeps the month's row of the
+    cumulative attendance table as its signature; if the portal later reports different counts for that
+    month, the entry is ignored and the month is fetched again.
+
+    Files are read and written in a thread (`load` and `save`), so requests do not block the event loop on the disk.
+    At most `max_accounts` accounts are kept in memory, the least recently used ones are read from disk again.
+    """
+    def __init__(self, directory: str = settings.MONTHLY_ABSENT_CACHE_DIR, max_accounts: int = settings.MONTHLY_ABSENT_CACHE_MAX_ACCOUNTS) -> None:
+        self.directory = directory
+        self.max_accounts = max_accounts
+        self._accounts: OrderedDict[str, dict[str, dict]] = OrderedDict()
+        self._write_lock = asyncio.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def is_closed(month: int, year: int | str, today: datetime.date | None = None) -> bool:
+        """Check if a month is over, so its records can not change anymore."""
+        today = today or datetime.date.today()
+        return (int(year), int(month)) < (today.year, today.month)
+
+    @staticmethod
+    def signature(cumulative_row: dict) -> str:
+        """Signature of a month's row of the cumulative attendance table."""
+        return json.dumps(cumulative_row, sort_keys=True)
+
+    def _path(self, account: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]", "_", account) + ".json")
+
+    def _read(self, account: str) -> dict[str, dict]:
+        path = self._path(account)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as f:
+            return json.loads(f.read())
+
+    def _entries(self, account: str) -> dict[str, dict]:
+        if account not in self._accounts:
+            self._remember(account, self._read(account))
+        self._accounts.move_to_end(account)
+        return self._accounts[account]
+
+    def _remember(self, account: str, entries: dict[str, dict]) -> None:
+        self._accounts[account] = entries
+        while len(self._accounts) > self.max_accounts:
+            self._accounts.popitem(last=False)
+
+    async def load(self, account: str) -> None:
+        """Read an account's entries from disk, unless they are already loaded."""
+        if account not in self._accounts:
+            entries = await asyncio.to_thread(self._read, account)
+            if account not in self._accounts:
+                self._remember(account, entries)
+
+    def get(self, account: str, month: int, year: int | str, signature: str) -> list[dict] | None:
+        """Get cached absent records, or `None` if the month is open, unknown or changed."""
+        entry = self._entries(account).get(f"{year}-{month:02d}")
+        if entry is not None and entry["signature"] == signature and self.is_closed(month, year):
+            self.hits += 1
+            return entry["records"]
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict[str, int]:
+        """Loaded accounts and hit/miss counters."""
+        return {"accounts": len(self._accounts), "hits": self.hits, "misses": self.misses}
+
+    def put(self, account: str, month: int, year: int | str, signature: str, records: list[dict]) -> bool:
+        """Store absent records of a closed month. Returns `False` (and stores nothing) for the current month."""
+        if not self.is_closed(month, year):
+            return False
+        self._entries(account)[f"{year}-{month:02d}"] = {"signature": signature, "records": records}
+        return True
+
+    async def save(self, account: str) -> None:
+        """Write an account's entries to disk."""
+        # Taken before waiting for the lock, in case the account is evicted from memory meanwhile
+        entries = self._entries(account)
+        async with self._write_lock:
+            # Serialized under the lock, so a slower earlier write can not replace newer entries
+            data = json.dumps(entries, indent=4)
+            await asyncio.to_thread(atomic_write, self._path(account), data)
+
+
+monthly_absent_cache = MonthlyAbsentCache()
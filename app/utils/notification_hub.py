@@ -0,0 +1,65 @@
+# Path: app/utils/notification_hub.py
+# Description: In-process fan-out of new notifications to connected stream clients.
+
+import asyncio
+
+from app.config import settings
+
+
+class NotificationHub:
+    """Keeps one bounded queue per connected stream client, grouped by username.
+
+    Every notification is serialized once and put on the queues of its user's clients. Idle clients only
+    cost their queue. A client that falls `queue_size` events behind is disconnected instead of buffering
+    without limit, and it catches up from the database when it reconnects with `Last-Event-ID`.
+    """
+    def __init__(self, queue_size: int = settings.NOTIFICATION_STREAM_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+        # Metrics
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, username: str) -> asyncio.Queue:
+        """Register a client, it receives `(id, event bytes)` items and `None` when it should disconnect."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(username, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, username: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(username)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[username]
+
+    def is_subscribed(self, username: str) -> bool:
+        return username in self._subscribers
+
+    def publish(self, username: str, event_id: int, event: bytes) -> None:
+        """Fan out an already serialized event to the clients of `username`."""
+        self.published += 1
+        for queue in list(self._subscribers.get(username, ())):
+            try:
+                queue.put_nowait((event_id, event))
+            except asyncio.QueueFull:
+                # Too slow, make room for the disconnect marker and let it resume from the database
+                self.dropped += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                self.unsubscribe(username, queue)
+
+    def stats(self) -> dict[str, int]:
+        """Connected clients and fan-out counters."""
+        return {
+            "users": len(self._subscribers),
+            "clients": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+notification_hub = NotificationHub()
@@ -1,64 +1,152 @@
-# """Generates notifications for given user."""
-
-# from app.utils.data_models import NotificationModel
-# from app.env import settings
-# from pymongo import MongoClient
-
-# class Notifications:
-#     def __init__(self):
-#         self.client = MongoClient(
-#             f"mongodb://{settings.MONGO_DB_USER}:{settings.MONGO_DB_PASSWORD}@{settings.MONGO_DB_HOST}:{settings.MONGO_DB_PORT}"
-#         )
-#         self.db = self.client[settings.MONGO_DB_NAME]
-#         self.unread_notifications = self.db["unread_notifications"]
-#         self.read_notifications = self.db["read_notifications"]
-
-#     def __del__(self):
-#         self.client.close()
-
-#     def push_notification(self, notification: NotificationModel):
-#         if not (
-#             self.read_notifications.find_one(notification.model_dump())
-#             or self.unread_notifications.find_one(notification.model_dump())
-#         ):
-#             self.unread_notifications.insert_one(notification.model_dump())
-
-#     def retrieve_unread_notifications(self, username: str) -> list:
-#         """Retrieve unread notifications for given user and mark them as read."""
-#         notifications = list(self.unread_notifications.find({"username": username}))
-#         if not notifications:
-#             return []
-#         self.unread_notifications.delete_many(
-#             {"_id": {"$in": [notification["_id"] for notification in notifications]}}
-#         )
-#         self.read_notifications.insert_many(notifications)
-#         return [
-#             {
-#                 key: notification[key]
-#                 for key in notification
-#                 if key not in ["_id", "username"]
-#             }
-#             for notification in notifications
-#         ]
-
-#     def retrieve_all_notifications(self, username: str) -> list:
-#         """Retrieve all notifications for given user."""
-#         unread_notifications = list(
-#             self.unread_notifications.find({"username": username})
-#         )
-#         read_notifications = list(self.read_notifications.find({"username": username}))
-#         return [
-#             {
-#                 key: notification[key]
-#                 for key in notification
-#                 if key not in ["_id", "username"]
-#             }
-#             for notification in unread_notifications + read_notifications
-#             if notification
-#         ]
-
-
-# if __name__ == "__main__":
-#     notifications = Notifications()
-#     print(notifications.retrieve_unread_notifications("dp4310"))
-#     del notifications
+# Path: app/utils/notifications.py
+# Description: Stores attendance notifications in PostgreSQL and hands them out to users.
+
+import json
+from collections.abc import Callable
+from sqlalchemy import false, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from app.utils import database, models
+from app.utils.data_models import NotificationModel
+from app.utils.notification_hub import notification_hub
+
+# Called with every batch of newly stored notifications, must not block
+NotificationListener = Callable[[list[models.Notifications]], None]
+
+
+def notification_model(notification: models.Notifications) -> NotificationModel:
+    """Convert a `notifications` row to the model served by the API."""
+    return NotificationModel(
+        username=notification.Username,
+        subject_code=notification.SubjectCode,
+        subject=notification.Subject,
+        type=notification.Type,
+        num_lectures=notification.NumLectures,
+        previous_attendance_percentage=notification.PreviousAttendancePercentage,
+        current_attendance_percentage=notification.CurrentAttendancePercentage,
+        previous_captured_at=notification.PreviousCapturedAt,
+        current_captured_at=notification.CapturedAt,
+        previous_date=notification.PreviousCapturedAt.strftime("%d-%m-%Y"),
+        previous_time=notification.PreviousCapturedAt.strftime("%H:%M:%S"),
+        current_date=notification.CapturedAt.strftime("%d-%m-%Y"),
+        current_time=notification.CapturedAt.strftime("%H:%M:%S"),
+    )
+
+
+async def check_user(db: AsyncSession, username: str) -> None:
+    """Check that the user is registered for notifications."""
+    if not username:
+        raise HTTPException(
+            status_code=400, detail="username is required form parameter"
+        )
+    if await db.get(models.Users, username) is None:
+        raise HTTPException(
+            status_code=400, detail=f"{username}: User Not registered for Notifications"
+        )
+
+
+def sse_event(notification: models.Notifications) -> bytes:
+    """Format a notification as one Server-Sent Event, with its id for resuming."""
+    data = json.dumps(notification_model(notification).model_dump(mode="json", exclude={"username"}))
+    return f"id: {notification.Id}\nevent: notification\ndata: {data}\n\n".encode()
+
+
+class Notifications:
+    """Notification queue on the `notifications` table.
+
+    - Duplicates are dropped by the unique key on (user, subject, type, snapshot time) in the same INSERT.
+    - Unread notifications are fetched and marked as read with one `UPDATE ... RETURNING` on the
+      `(Username, Read, Id)` index.
+    - Both reads are paginated with the last seen notification id as the cursor.
+    """
+    def __init__(self) -> None:
+        self.listeners: list[NotificationListener] = []
+
+    def add_listener(self, listener: NotificationListener) -> None:
+        """Call `listener` with every batch of newly stored notifications (e.g. to deliver them)."""
+        self.listeners.append(listener)
+
+    async def push_notifications(self, events: list[NotificationModel]) -> list[models.Notifications]:
+        """Insert notifications, skipping ones that already exist. Returns the inserted rows."""
+        if not events:
+            return []
+
+        rows = [
+            {
+                "Username": event.username,
+                "SubjectCode": event.subject_code,
+                "Subject": event.subject,
+                "Type": event.type,
+                "NumLectures": event.num_lectures,
+                "PreviousAttendancePercentage": event.previous_attendance_percentage,
+                "CurrentAttendancePercentage": event.current_attendance_percentage,
+                "PreviousCapturedAt": event.previous_captured_at,
+                "CapturedAt": event.current_captured_at,
+            }
+            for event in events
+        ]
+        async with database.Session() as db:
+            inserted = (await db.scalars(
+                insert(models.Notifications)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["Username", "SubjectCode", "Type", "CapturedAt"])
+                .returning(models.Notifications)
+            )).all()
+            await db.commit()
+
+        inserted = sorted(inserted, key=lambda notification: notification.Id)
+        if inserted:
+            for listener in self.listeners:
+                listener(inserted)
+        return inserted
+
+    async def retrieve_unread_notifications(
+        self, db: AsyncSession, username: str, cursor: int = 0, limit: int = 50
+    ) -> list[models.Notifications]:
+        """Retrieve unread notifications for given user after `cursor` and mark them as read."""
+        unread = (
+            select(models.Notifications.Id)
+            .where(
+                models.Notifications.Username == username,
+                models.Notifications.Read == false(),
+                models.Notifications.Id > cursor,
+            )
+            .order_by(models.Notifications.Id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        notifications = (await db.scalars(
+            update(models.Notifications)
+            .where(models.Notifications.Id.in_(unread))
+            .values(Read=True)
+            .returning(models.Notifications)
+            .execution_options(synchronize_session=False)
+        )).all()
+        await db.commit()
+        return sorted(notifications, key=lambda notification: notification.Id)
+
+    async def retrieve_all_notifications(
+        self, db: AsyncSession, username: str, cursor: int = 0, limit: int = 50
+    ) -> list[models.Notifications]:
+        """Retrieve read and unread notifications for given user after `cursor`."""
+        return (await db.scalars(
+            select(models.Notifications)
+            .where(models.Notifications.Username == username, models.Notifications.Id > cursor)
+            .order_by(models.Notifications.Id)
+            .limit(limit)
+        )).all()
+
+
+def publish_to_stream(inserted: list[models.Notifications]) -> None:
+    """Hand new notifications to connected stream clients."""
+    for notification in inserted:
+        # Only serialize for users with connected stream clients
+        if notification_hub.is_subscribed(notification.Username):
+            notification_hub.publish(notification.Username, notification.Id, sse_event(notification))
+
+
+notifications = Notifications()
+notifications.add_listener(publish_to_stream)
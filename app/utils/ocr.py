@@ -0,0 +1,98 @@
+# Path: app/utils/ocr.py
+# Description: Bounded worker pool that runs captcha OCR away from the event loop.
+
+import time
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+from app.config import settings
+from app.utils.captcha_solver import solve_captcha
+
+
+class OCRWorkerPool:
+    """Runs OCR jobs in a thread or process pool with a cap on concurrent jobs."""
+    def __init__(
+        self,
+        executor: str = settings.OCR_EXECUTOR,
+        max_workers: int = settings.OCR_MAX_WORKERS,
+        max_concurrency: int = settings.OCR_MAX_CONCURRENCY,
+    ) -> None:
+        if executor not in ("thread", "process"):
+            raise ValueError(f"OCR_EXECUTOR must be 'thread' or 'process', got {executor!r}")
+
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        # Metrics
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ocr")
+        return self._executor
+
+    async def solve(self, content: bytes) -> str:
+        """Solve the given captcha image bytes without blocking the event loop."""
+        queued_at = time.perf_counter()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        started_at = time.perf_counter()
+        self.total_wait_seconds += started_at - queued_at
+        try:
+            loop = asyncio.get_running_loop()
+            text = await loop.run_in_executor(self.executor, solve_captcha, content)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self.total_run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+
+        self.completed += 1
+        return text
+
+    def stats(self) -> dict[str, int | float | str]:
+        """Current pool limits, queue depth and timings."""
+        finished = self.completed + self.failed
+        return {
+            "executor": self.executor_type,
+            "solver": settings.CAPTCHA_SOLVER,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "running": self.running,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_seconds": self.total_wait_seconds / finished if finished else 0.0,
+            "avg_run_seconds": self.total_run_seconds / finished if finished else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+ocr_pool = OCRWorkerPool()
@@ -0,0 +1,97 @@
+# Path: app/utils/portal_pages.py
+# Description: Parsers that turn SRM Student Portal pages into Python records.
+
+from app.utils.html_tables import read_tables, Cell
+
+MONTH_MAP = {
+    "JAN": 1,
+    "FEB": 2,
+    "MAR": 3,
+    "APR": 4,
+    "MAY": 5,
+    "JUN": 6,
+    "JUL": 7,
+    "AUG": 8,
+    "SEP": 9,
+    "OCT": 10,
+    "NOV": 11,
+    "DEC": 12,
+}
+
+# Rows of the attendance table that are not subjects
+BLACKLIST_CODES = ["CL", "Total"]
+
+CLASS_TIME = [
+    "9:20-10:10",
+    "10:10-11:00",
+    "11:10-12:00",
+    "12:00-12:50",
+    "2:00-2:50",
+    "2:50-3:40",
+    "3:40-4:30",
+]
+
+
+def parse_attendance_page(content: bytes | str) -> tuple[list[dict[str, Cell]], list[dict[str, Cell]]]:
+    """Parse Attendance Page into (course wise attendance, cumulative monthly attendance)."""
+    attendance_table, cumulative_attendance_table = read_tables(content, class_name="table")[:2]
+
+    # Remove Unwanted Subject Codes
+    attendance = [row for row in attendance_table if row["Code"] not in BLACKLIST_CODES]
+
+    return attendance, cumulative_attendance_table
+
+
+def attendance_months(cumulative_attendance: list[dict[str, Cell]]) -> list[tuple[int, str]]:
+    """Get (month, year) of every row of the cumulative attendance table."""
+    month_year = []
+    for row in cumulative_attendance:
+        mon, year = row["Month / Year"].split(" / ")
+        month_year.append((MONTH_MAP[mon], year))
+    return month_year
+
+
+def parse_monthly_absent_page(content: bytes | str) -> list[dict[str, Cell]]:
+    """Parse Monthly Absent Details Page."""
+    return read_tables(content)[0]
+
+
+def parse_timetable_page(content: bytes | str) -> tuple[list[dict[str, Cell]], dict[str, str]]:
+    """Parse Timetable Page into (timetable rows, legend map of subject code to subject name)."""
+    timetable, legends = read_tables(content, class_name="table")[:2]
+    legend_map = {
+        str(data["Code"]).strip(): str(data["Description"]).strip()
+        for data in legends
+    }
+    return timetable, legend_map
+
+
+def build_timetable(timetable: list[dict[str, Cell]], sub_map: dict[str, str]) -> dict[str, dict[str, str | None]]:
+    """Build `{day: {class time: subject}}` from timetable rows, naming subjects using `sub_map`."""
+    def subject(cell: Cell) -> Cell:
+        # Empty slot
+        if cell == "-":
+            return None
+
+        # If there is a single subject code in the cell
+        if cell in sub_map:
+            return sub_map[cell]
+
+        # For electives where there are multiple subject codes
+        if isinstance(cell, str) and len(cell.split(" ")) > 1:
+            return " / ".join(sub_map[sub_code] for sub_code in cell.split(" "))
+
+        return cell
+
+    new_timetable = {}
+    for idx, row in enumerate(timetable):
+        # Last row of the table is not a day order
+        if idx == 5:
+            continue
+
+        day, *cells = [value for key, value in row.items() if key != "04:00-04:50"]
+        new_timetable[subject(day)] = {
+            class_time: subject(cell) for class_time, cell in zip(CLASS_TIME, cells)
+        }
+
+    return new_timetable
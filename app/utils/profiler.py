@@ -0,0 +1,307 @@
+# Path: app/utils/profiler.py
+# Description: Opt-in sampling profiler for single requests, writes collapsed stacks for flamegraph tools.
+
+import os
+import re
+import sys
+import time
+import random
+import asyncio
+import hmac
+import threading
+import contextvars
+import weakref
+import sysconfig
+from collections import Counter
+from datetime import datetime, timezone
+
+from app.logging import logger
+from app.config import settings
+from app.utils import atomic_write
+
+# Profile of the request the current task (or the task that created it) belongs to
+current_profile: contextvars.ContextVar["Profile | None"] = contextvars.ContextVar("current_profile", default=None)
+
+
+class Profile:
+    """Samples of one request: `{"root;frame;...;leaf": count}`."""
+    def __init__(self, name: str, task: asyncio.Task, loop: asyncio.AbstractEventLoop) -> None:
+        self.name = name
+        self.task = task
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.tasks: weakref.WeakSet[asyncio.Task] = weakref.WeakSet([task])
+        self.samples: Counter[str] = Counter()
+        self.started_at = time.monotonic()
+        self.truncated = False
+
+    def folded(self) -> str:
+        """Samples in the collapsed stack format read by flamegraph.pl, speedscope and inferno."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class SamplingProfiler:
+    """Samples the stacks of profiled requests from a background thread every `interval` seconds.
+
+    - While a task of the request is running on the event loop, the loop thread's stack is sampled
+      (`sys._current_frames`), so CPU work such as page parsing shows up with its full call stack.
+    - While the request is waiting, its coroutine await chain is sampled instead, so awaited portal
+      calls and OCR jobs show up as time spent at the `await` that waits for them.
+
+    Tasks created by a profiled request (e.g. `asyncio.gather` in the monthly fan-out) belong to it through
+    a task factory that is only installed once the first request is profiled. Profiles are written as
+    `.folded` files to `directory`, and the oldest files are deleted when it grows over `max_bytes`.
+    """
+    def __init__(
+        self,
+        directory: str = settings.PROFILER_DIR,
+        max_bytes: int = settings.PROFILER_DIR_MAX_BYTES,
+        interval: float = settings.PROFILER_INTERVAL_SECONDS,
+        max_seconds: float = settings.PROFILER_MAX_SECONDS,
+        max_concurrent: int = settings.PROFILER_MAX_CONCURRENT,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_concurrent = max_concurrent
+
+        self._active: set[Profile] = set()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._labels: dict[object, str] = {}
+        # Prefixes stripped from file names in stack labels: the project, then the standard library
+        self._path_prefixes = (
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + os.sep,
+            sysconfig.get_paths()["stdlib"] + os.sep,
+        )
+
+        # Metrics
+        self.profiled = 0
+        self.skipped = 0
+        self.written = 0
+        self.deleted = 0
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro, context: contextvars.Context | None = None, **kwargs) -> asyncio.Task:
+        # Newer Pythons also pass `name` (and `eager_start`) to the task factory
+        task = asyncio.Task(coro, loop=loop, context=context, **kwargs)
+        profile = context.get(current_profile) if context is not None else current_profile.get()
+        if profile is not None:
+            profile.tasks.add(task)
+        return task
+
+    def start(self, name: str) -> Profile | None:
+        """Start profiling the current task, or return `None` if `max_concurrent` requests are already profiled."""
+        loop = asyncio.get_running_loop()
+        if loop.get_task_factory() is None:
+            loop.set_task_factory(self._task_factory)
+
+        with self._condition:
+            if len(self._active) >= self.max_concurrent:
+                self.skipped += 1
+                return None
+            profile = Profile(name, asyncio.current_task(), loop)
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+        self.profiled += 1
+        return profile
+
+    def stop(self, profile: Profile) -> None:
+        """Stop sampling `profile`, no samples are added after this returns."""
+        with self._condition:
+            self._active.discard(profile)
+
+    def _run(self) -> None:
+        with self._condition:
+            while True:
+                while not self._active:
+                    self._condition.wait()
+                try:
+                    self._sample()
+                except Exception as e:
+                    logger.error(f"Error in sampling request profiles: {e}")
+                # Releases the lock while sleeping
+                self._condition.wait(self.interval)
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        now = time.monotonic()
+        for profile in list(self._active):
+            if now - profile.started_at > self.max_seconds:
+                profile.truncated = True
+                self._active.discard(profile)
+                continue
+
+            running = asyncio.current_task(profile.loop)
+            if running is profile.task:
+                stack = self._thread_stack(frames.get(profile.thread_id), running)
+            elif running is not None and running in profile.tasks:
+                # A task the request started, under what the request is waiting in
+                stack = self._coroutine_stack(profile.task.get_coro()) + self._thread_stack(frames.get(profile.thread_id), running)
+            else:
+                stack = self._await_stack(profile)
+            profile.samples[";".join([profile.name, *stack])] += 1
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = code.co_filename
+            if "site-packages" + os.sep in path:
+                path = path.split("site-packages" + os.sep, 1)[1]
+            else:
+                for prefix in self._path_prefixes:
+                    if path.startswith(prefix):
+                        path = path[len(prefix):]
+                        break
+            label = self._labels[code] = f"{code.co_qualname} ({path})"
+        return label
+
+    def _thread_stack(self, frame, task: asyncio.Task) -> list[str]:
+        """Stack of the event loop thread, outermost first, starting at the running task's coroutine."""
+        root = getattr(task.get_coro(), "cr_frame", None)
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            if frame is root:
+                break
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def _coroutine_stack(self, awaitable) -> list[str]:
+        """Frames of a coroutine's await chain, outermost first."""
+        stack = []
+        while awaitable is not None:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None) or getattr(awaitable, "ag_frame", None)
+            if frame is None:
+                break
+            stack.append(self._label(frame.f_code))
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None) or getattr(awaitable, "ag_await", None)
+        return stack
+
+    def _await_stack(self, profile: Profile) -> list[str]:
+        """Await chain of a waiting request, outermost first, ending with what it waits for.
+
+        The chain continues into awaited tasks and `gather` children. When a task waits on something that
+        does not lead to a task (e.g. `asyncio.shield`), it continues into another pending task of the request.
+        """
+        stack = []
+        task, visited = profile.task, set()
+        while True:
+            visited.add(task)
+            stack += self._coroutine_stack(task.get_coro())
+            waiter = getattr(task, "_fut_waiter", None)
+            if isinstance(waiter, asyncio.Task):
+                pending = [waiter]
+            else:
+                pending = [child for child in getattr(waiter, "_children", ()) if isinstance(child, asyncio.Task) and not child.done()]
+                if not pending:
+                    pending = [other for other in list(profile.tasks) if other not in visited and not other.done()]
+            pending = [other for other in pending if other not in visited]
+            if not pending:
+                stack.append(f"[await {type(waiter).__name__}]" if waiter is not None else "[scheduled]")
+                return stack
+            task = random.choice(pending)
+
+    def save(self, profile: Profile, filename: str) -> None:
+        """Write a profile and delete the oldest other profiles while the directory is over `max_bytes`."""
+        if not profile.samples:
+            return
+        path = os.path.join(self.directory, filename)
+        atomic_write(path, profile.folded())
+        self.written += 1
+
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".folded"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, old_path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if old_path == path:
+                continue
+            try:
+                os.remove(old_path)
+                self.deleted += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self) -> dict[str, int | float | str]:
+        """Sampling settings and counters."""
+        return {
+            "directory": self.directory,
+            "interval": self.interval,
+            "active": len(self._active),
+            "profiled": self.profiled,
+            "skipped": self.skipped,
+            "written": self.written,
+            "deleted": self.deleted,
+        }
+
+
+profiler = SamplingProfiler()
+
+
+class ProfilerMiddleware:
+    """ASGI middleware that profiles requests carrying `PROFILER_HEADER` (with `PROFILER_TOKEN` when set) and a
+    random `PROFILER_SAMPLE_RATE` share of the others. The profile file name is sent back in the same header.
+
+    Only added to the app when `PROFILER_ENABLED` is set, so it costs nothing otherwise.
+    """
+    def __init__(self, app, sample_rate: float = settings.PROFILER_SAMPLE_RATE, header: str = settings.PROFILER_HEADER,
+                 token: str | None = settings.PROFILER_TOKEN) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode()
+        self.token = token
+
+    def wants_profile(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == self.header:
+                if self.token is None:
+                    return value not in (b"", b"0")
+                return hmac.compare_digest(value, self.token.encode())
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{scope['method']} {scope['path']}"
+        profile = profiler.start(name)
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = datetime.now(timezone.utc)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        filename = f"{started:%Y%m%dT%H%M%S.%f}-{scope['method']}-{slug}.folded"
+
+        token = current_profile.set(profile)
+
+        async def send_with_profile_header(message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (self.header, filename.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_header)
+        finally:
+            profiler.stop(profile)
+            current_profile.reset(token)
+            elapsed = time.monotonic() - profile.started_at
+            try:
+                await asyncio.to_thread(profiler.save, profile, filename)
+            except Exception as e:
+                logger.error(f"Error in saving request profile {filename}: {e}")
+            logger.info(f"Profiled {name} in {elapsed * 1000:.0f} ms ({sum(profile.samples.values())} samples): {filename}"
+                        + (" (truncated)" if profile.truncated else ""))
@@ -0,0 +1,147 @@
+# Path: app/utils/rate_limiter.py
+# Description: Per-host adaptive concurrency limiter and token bucket rate limiter for SRM Student Portal requests.
+
+import time
+import asyncio
+from collections import deque
+
+from app.config import settings
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts of up to `burst` requests."""
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.waiting = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        self.waiting += 1
+        try:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+
+class AdaptiveLimiter:
+    """Caps concurrent requests to one host and paces them with a token bucket.
+
+    The concurrency limit adapts AIMD style: it grows by about one per round of healthy responses and is
+    halved on 5xx responses, transport errors and replies slower than `slow_threshold` seconds. The
+    request rate is scaled with it, so a struggling portal gets both fewer parallel and fewer total requests.
+    """
+    def __init__(
+        self,
+        host: str,
+        max_concurrency: int = settings.PORTAL_MAX_CONCURRENCY,
+        min_concurrency: int = settings.PORTAL_MIN_CONCURRENCY,
+        rate: float = settings.PORTAL_RATE_LIMIT,
+        burst: int = settings.PORTAL_RATE_BURST,
+        slow_threshold: float = settings.PORTAL_SLOW_RESPONSE_SECONDS,
+    ) -> None:
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_rate = rate
+        self.slow_threshold = slow_threshold
+
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.bucket = TokenBucket(rate, burst)
+        self._waiters: deque[asyncio.Future] = deque()
+
+        # Metrics
+        self.requests = 0
+        self.backoffs = 0
+
+    async def acquire(self) -> None:
+        """Wait for a concurrency slot and a rate token."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Slot was handed over right before the cancellation
+                    self.in_flight -= 1
+                    self._wake()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            self.in_flight -= 1
+            self._wake()
+            raise
+        self.requests += 1
+
+    def release(self, healthy: bool, elapsed: float) -> None:
+        """Free a slot and adapt the limits to how the request went."""
+        self.in_flight -= 1
+
+        if not healthy or elapsed > self.slow_threshold:
+            self.backoffs += 1
+            self.limit = max(self.min_concurrency, self.limit / 2)
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        self.bucket.rate = self.max_rate * self.limit / self.max_concurrency
+
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to waiting requests in FIFO order."""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> dict[str, int | float | str]:
+        """Current limits and queue lengths."""
+        return {
+            "host": self.host,
+            "concurrency_limit": int(self.limit),
+            "max_concurrency": self.max_concurrency,
+            "rate_limit": round(self.bucket.rate, 2),
+            "max_rate": self.max_rate,
+            "in_flight": self.in_flight,
+            "waiting_for_slot": len(self._waiters),
+            "waiting_for_token": self.bucket.waiting,
+            "requests": self.requests,
+            "backoffs": self.backoffs,
+        }
+
+
+class HostLimiters:
+    """One `AdaptiveLimiter` per host."""
+    def __init__(self) -> None:
+        self._limiters: dict[str, AdaptiveLimiter] = {}
+
+    def get(self, host: str) -> AdaptiveLimiter:
+        if host not in self._limiters:
+            self._limiters[host] = AdaptiveLimiter(host)
+        return self._limiters[host]
+
+    def stats(self) -> list[dict[str, int | float | str]]:
+        return [limiter.stats() for limiter in self._limiters.values()]
+
+
+portal_limiters = HostLimiters()
@@ -1,7 +1,7 @@
 # Path: app/utils/schemas.py
 # Description: This file contains schemas for API Endpoints.
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class CreateSubjectAlias(BaseModel):
     subject_code: str
@@ -11,4 +11,20 @@ class ResponseGetSubjectDetails(CreateSubjectAlias):
     subject_name: str
 
 class ErrorResponse(BaseModel):
-    detail: str
\ No newline at end of file
+    detail: str
+
+class CreateWebhookTarget(BaseModel):
+    username: str
+    url: str
+    batch_size: int = Field(default=1, ge=1)
+
+class ResponseWebhookTarget(CreateWebhookTarget):
+    id: int
+
+class ResponseWebhookDeadLetter(BaseModel):
+    id: int
+    target_id: int
+    url: str
+    payload: str
+    attempts: int
+    last_error: str | None
@@ -0,0 +1,188 @@
+# Path: app/utils/session_pool.py
+# Description: Process-wide pool of logged in SRM Student Portal sessions, so requests can reuse a login instead of doing a fresh one every time.
+
+import time
+import asyncio
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.logging import logger
+from app.config import settings
+from app.utils.attendance_manager import AttendanceManager
+
+
+class SessionPool:
+    """Keeps one logged in `AttendanceManager` per credential alive across requests.
+
+    A session is considered valid until `ttl` seconds after the last successful portal response.
+    Sessions that were used within the last `ttl` seconds get logged in again `refresh_margin` seconds
+    before that. Sessions not used since are left to expire, and logged in again on their next use, so
+    idle sessions cost no captcha solves. Sessions idle for longer than `idle_timeout` are closed. If the portal expires a session early,
+    `AttendanceManager` notices it on the next page request and logs in again by itself.
+
+    Requests hold a session while they use it (`session()`), so a session that is evicted meanwhile is
+    only closed once the last request using it has released it.
+    """
+    def __init__(
+        self,
+        ttl: int = settings.PORTAL_SESSION_TTL,
+        refresh_margin: int = settings.PORTAL_SESSION_REFRESH_MARGIN,
+        idle_timeout: int = settings.PORTAL_SESSION_IDLE_TIMEOUT,
+        refresh_interval: int = settings.PORTAL_SESSION_REFRESH_INTERVAL,
+        max_size: int = settings.PORTAL_SESSION_POOL_SIZE,
+    ) -> None:
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.idle_timeout = idle_timeout
+        self.refresh_interval = refresh_interval
+        self.max_size = max_size
+
+        self._sessions: OrderedDict[tuple[str, str], AttendanceManager] = OrderedDict()
+        self._last_used: dict[tuple[str, str], float] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        # Requests using each session, and evicted sessions that are closed once no request uses them
+        self._in_use: dict[AttendanceManager, int] = {}
+        self._retired: set[AttendanceManager] = set()
+        self._refresher: asyncio.Task | None = None
+
+    def _is_valid(self, am: AttendanceManager, now: float) -> bool:
+        """Cheap validity check, without making any request to the portal."""
+        return am.last_active_at is not None and now - am.last_active_at < self.ttl
+
+    async def acquire(
+        self,
+        username: str = settings.SRM_PORTAL_USERNAME,
+        password: str = settings.SRM_PORTAL_PASSWORD,
+    ) -> AttendanceManager:
+        """Get a logged in `AttendanceManager` for the given credentials, and hold it until `release`.
+
+        The returned instance is shared, so callers must not `close()` it. Use `session()` to release it
+        when done.
+        """
+        key = (username, password)
+        now = time.monotonic()
+
+        # Fast path: session exists and is still valid
+        am = self._sessions.get(key)
+        if am is not None and self._is_valid(am, now):
+            self._touch(key, now)
+            self._hold(am)
+            return am
+
+        # Slow path: only one coroutine per credential should login
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            am = self._sessions.get(key)
+            if am is None:
+                am = AttendanceManager(username, password)
+                self._sessions[key] = am
+            self._hold(am)
+
+            if not self._is_valid(am, time.monotonic()):
+                try:
+                    await am.relogin()
+                except BaseException:
+                    await self._evict(key)
+                    await self.release(am)
+                    raise
+
+            self._touch(key, time.monotonic())
+
+        await self._enforce_max_size()
+        return am
+
+    async def release(self, am: AttendanceManager) -> None:
+        """Stop holding a session from `acquire`, closing it if it was evicted meanwhile."""
+        count = self._in_use.get(am, 0) - 1
+        if count > 0:
+            self._in_use[am] = count
+            return
+        self._in_use.pop(am, None)
+        if am in self._retired:
+            self._retired.discard(am)
+            await am.close()
+
+    @asynccontextmanager
+    async def session(
+        self,
+        username: str = settings.SRM_PORTAL_USERNAME,
+        password: str = settings.SRM_PORTAL_PASSWORD,
+    ) -> AsyncIterator[AttendanceManager]:
+        """Hold a logged in session for the block: `async with session_pool.session() as am: ...`"""
+        am = await self.acquire(username, password)
+        try:
+            yield am
+        finally:
+            await self.release(am)
+
+    def _hold(self, am: AttendanceManager) -> None:
+        self._in_use[am] = self._in_use.get(am, 0) + 1
+
+    def _touch(self, key: tuple[str, str], now: float) -> None:
+        """Mark session as recently used."""
+        self._last_used[key] = now
+        self._sessions.move_to_end(key)
+
+    async def _evict(self, key: tuple[str, str]) -> None:
+        """Remove a session from the pool and close its HTTP client, or leave that to the last `release`."""
+        am = self._sessions.pop(key, None)
+        self._last_used.pop(key, None)
+        self._locks.pop(key, None)
+        if am is None:
+            return
+        if am in self._in_use:
+            self._retired.add(am)
+        else:
+            await am.close()
+
+    async def _enforce_max_size(self) -> None:
+        """Close least recently used sessions above `max_size`."""
+        while len(self._sessions) > self.max_size:
+            key = next(iter(self._sessions))
+            await self._evict(key)
+
+    async def refresh(self) -> None:
+        """Close idle sessions and login again to recently used sessions that are about to expire."""
+        now = time.monotonic()
+        for key, am in list(self._sessions.items()):
+            lock = self._locks.setdefault(key, asyncio.Lock())
+            if lock.locked():
+                continue
+
+            idle = now - self._last_used.get(key, now)
+            if idle > self.idle_timeout:
+                logger.info(f"Closing Idle Portal Session for {key[0]}")
+                await self._evict(key)
+
+            elif idle <= self.ttl and am.last_active_at is not None and now - am.last_active_at > self.ttl - self.refresh_margin:
+                logger.info(f"Refreshing Portal Session for {key[0]}")
+                async with lock:
+                    try:
+                        await am.relogin()
+                    except Exception as e:
+                        logger.error(f"Error in refreshing portal session for {key[0]}: {e}")
+                        await self._evict(key)
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error in portal session refresher: {e}")
+
+    def start(self) -> None:
+        """Start the background refresher task."""
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_forever())
+
+    async def close(self) -> None:
+        """Stop the refresher and close every session."""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        for key in list(self._sessions):
+            await self._evict(key)
+
+
+session_pool = SessionPool()
@@ -0,0 +1,64 @@
+# Path: app/utils/snapshot_store.py
+# Description: Stores time-series snapshots of users' course wise attendance, writing only real changes.
+
+import json
+import hashlib
+import datetime
+
+from sqlalchemy import insert, update
+
+from app.utils import database, models
+
+
+def snapshot_rows(username: str, attendance: list[dict], captured_at: datetime.datetime) -> list[dict]:
+    """Convert course wise attendance rows from the portal into `attendance_snapshots` rows."""
+    return [
+        {
+            "Username": username,
+            "SubjectCode": str(data["Code"]),
+            "SubjectName": str(data["Description"]),
+            "MaxHours": int(data["Max. hours"]),
+            "AttendedHours": int(data["Att. hours"]),
+            "AbsentHours": int(data["Absent hours"]),
+            "TotalPercentage": float(data["Total Percentage"]),
+            "CapturedAt": captured_at,
+        }
+        for data in attendance
+    ]
+
+
+def snapshot_hash(rows: list[dict]) -> str:
+    """Content hash of a snapshot, independent of capture time and row order."""
+    content = sorted(
+        json.dumps({key: value for key, value in row.items() if key != "CapturedAt"}, sort_keys=True)
+        for row in rows
+    )
+    return hashlib.sha256("\n".join(content).encode()).hexdigest()
+
+
+async def save_snapshot(username: str, attendance: list[dict]) -> datetime.datetime | None:
+    """Store a user's attendance snapshot in one transaction, unless it is the same as the last one.
+
+    Returns the capture time of the stored snapshot, or `None` if nothing changed.
+    """
+    captured_at = datetime.datetime.now(datetime.timezone.utc)
+    rows = snapshot_rows(username, attendance, captured_at)
+    digest = snapshot_hash(rows)
+
+    async with database.Session() as db:
+        # Swapping the hash first both detects unchanged snapshots and serializes writers of the same user
+        changed = (await db.execute(
+            update(models.Users)
+            .where(models.Users.Username == username, models.Users.SnapshotHash.is_distinct_from(digest))
+            .values(SnapshotHash=digest)
+            .returning(models.Users.Username)
+        )).first()
+        if changed is None or not rows:
+            await db.rollback()
+            return None
+
+        # One multi-row INSERT ... VALUES statement for all subjects
+        await db.execute(insert(models.AttendanceSnapshots).values(rows))
+        await db.commit()
+
+    return captured_at
@@ -0,0 +1,69 @@
+# Path: app/utils/subject_index.py
+# Description: Process-local, read-through index of the `subjects` table by subject code, alias and subject name.
+
+import time
+import asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.utils import models, schemas
+
+
+class SubjectIndex:
+    """In-memory copy of the `subjects` table with one lookup map per searchable column.
+
+    The whole table is loaded with one query on first use and again after `invalidate()` (called on every
+    write through the alias router) or after `max_age` seconds, which bounds staleness across workers.
+    """
+    def __init__(self, max_age: float = settings.SUBJECT_INDEX_MAX_AGE) -> None:
+        self.max_age = max_age
+        self.by_code: dict[str, schemas.ResponseGetSubjectDetails] = {}
+        self.by_alias: dict[str, schemas.ResponseGetSubjectDetails] = {}
+        self.by_name: dict[str, schemas.ResponseGetSubjectDetails] = {}
+        self.loaded_at: float | None = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+        # Metrics
+        self.loads = 0
+
+    async def load(self, db: AsyncSession) -> None:
+        """Load the whole `subjects` table."""
+        version = self._version
+        by_code, by_alias, by_name = {}, {}, {}
+        for subject in (await db.execute(select(models.Subjects))).scalars():
+            record = schemas.ResponseGetSubjectDetails(
+                subject_code=subject.SubjectCode,
+                subject_name=subject.SubjectName,
+                alias=subject.Alias,
+            )
+            by_code[record.subject_code] = record
+            by_alias.setdefault(record.alias, record)
+            by_name.setdefault(record.subject_name, record)
+
+        self.by_code, self.by_alias, self.by_name = by_code, by_alias, by_name
+        self.loads += 1
+        # A write during the load may be missing from what we read, so only then keep it outdated
+        if version == self._version:
+            self.loaded_at = time.monotonic()
+
+    def is_outdated(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.max_age
+
+    async def ensure_loaded(self, db: AsyncSession) -> "SubjectIndex":
+        """Load the table if it was never loaded, was invalidated or is too old."""
+        if self.is_outdated():
+            # Concurrent requests wait for one load instead of each running the query
+            async with self._lock:
+                if self.is_outdated():
+                    await self.load(db)
+        return self
+
+    def invalidate(self) -> None:
+        """Mark the index as outdated, the next lookup reloads it."""
+        self._version += 1
+        self.loaded_at = None
+
+
+subject_index = SubjectIndex()
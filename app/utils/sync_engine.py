@@ -0,0 +1,217 @@
+# Path: app/utils/sync_engine.py
+# Description: Background engine that keeps attendance of every registered user up to date.
+
+import random
+import asyncio
+import hashlib
+import datetime
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import select, update, or_
+
+from app.logging import logger
+from app.config import settings
+from app.utils import database, models
+from app.utils.attendance_manager import AttendanceManager
+from app.utils.portal_pages import parse_attendance_page
+from app.utils.attendance_diff import diff_engine
+
+# Called with (username, course wise attendance) after every successful sync
+SyncHook = Callable[[str, list[dict]], Awaitable[None]]
+
+
+def utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class AttendanceSyncEngine:
+    """Syncs every user in the `users` table once per `interval`, using a fixed size worker pool.
+
+    - Users are claimed from the database in order of `NextSyncAt`, only as many as there are free
+      workers, so every user gets the same share and nobody is starved by a large backlog.
+    - Claiming pushes `NextSyncAt` forward by `lease` seconds with `FOR UPDATE SKIP LOCKED`, so a user is
+      never synced twice at once, even with several app processes. If a process dies, the lease expires
+      and another one picks the user up.
+    - New users get a stable offset inside the interval (hash of the username) and every next run gets
+      random jitter, so syncs are spread over the interval instead of arriving in bursts.
+    - Failures are retried with exponential backoff, capped at `max_backoff`.
+    """
+    def __init__(
+        self,
+        interval: int = settings.SYNC_INTERVAL_SECONDS,
+        jitter: int = settings.SYNC_JITTER_SECONDS,
+        max_concurrent_users: int = settings.SYNC_MAX_CONCURRENT_USERS,
+        poll_interval: int = settings.SYNC_POLL_SECONDS,
+        lease: int = settings.SYNC_LEASE_SECONDS,
+        max_backoff: int = settings.SYNC_MAX_BACKOFF_SECONDS,
+    ) -> None:
+        self.interval = interval
+        self.jitter = jitter
+        self.max_concurrent_users = max_concurrent_users
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_backoff = max_backoff
+
+        self.hooks: list[SyncHook] = []
+        self._queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._busy = 0
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+        # Metrics
+        self.synced = 0
+        self.failed = 0
+
+    def add_hook(self, hook: SyncHook) -> None:
+        """Run `hook` after every successful user sync (e.g. to store snapshots)."""
+        self.hooks.append(hook)
+
+    def first_sync_at(self, username: str) -> datetime.datetime:
+        """Stable slot inside the interval for a user that was never synced."""
+        offset = int(hashlib.sha256(username.encode()).hexdigest(), 16) % max(self.interval, 1)
+        return utcnow() + datetime.timedelta(seconds=offset)
+
+    def next_sync_at(self, consecutive_failures: int = 0) -> datetime.datetime:
+        """When to sync a user next, with jitter, backing off after failures."""
+        if consecutive_failures:
+            delay = min(self.max_backoff, self.poll_interval * 2 ** consecutive_failures)
+        else:
+            delay = self.interval
+        delay += random.uniform(-self.jitter, self.jitter)
+        return utcnow() + datetime.timedelta(seconds=max(delay, self.poll_interval))
+
+    async def schedule_new_users(self) -> None:
+        """Give users that have no `NextSyncAt` yet their slot in the interval."""
+        async with database.Session() as db:
+            usernames = (await db.execute(
+                select(models.Users.Username).where(models.Users.NextSyncAt.is_(None))
+            )).scalars().all()
+            if usernames:
+                # One executemany UPDATE by primary key, skipping users claimed in the meantime
+                await db.execute(
+                    update(models.Users).where(models.Users.NextSyncAt.is_(None)).execution_options(synchronize_session=None),
+                    [{"Username": username, "NextSyncAt": self.first_sync_at(username)} for username in usernames],
+                )
+            await db.commit()
+
+    async def claim_due_users(self, limit: int) -> list[tuple[str, str]]:
+        """Lease up to `limit` users that are due, oldest due first."""
+        now = utcnow()
+        due = (
+            select(models.Users.Username)
+            .where(or_(models.Users.NextSyncAt.is_(None), models.Users.NextSyncAt <= now))
+            .order_by(models.Users.NextSyncAt.asc().nulls_first())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with database.Session() as db:
+            claimed = (await db.execute(
+                update(models.Users)
+                .where(models.Users.Username.in_(due))
+                .values(NextSyncAt=now + datetime.timedelta(seconds=self.lease))
+                .returning(models.Users.Username, models.Users.Password)
+            )).all()
+            await db.commit()
+        return [(username, password) for username, password in claimed]
+
+    async def sync_user(self, username: str, password: str) -> list[dict]:
+        """Fetch a user's course wise attendance from the portal (the monthly absent pages are not needed)."""
+        am = AttendanceManager(username, password)
+        try:
+            await am.login()
+            attendance_page = await am.attendance_page()
+            attendance, _ = parse_attendance_page(attendance_page.content)
+        finally:
+            await am.close()
+
+        for hook in self.hooks:
+            await hook(username, attendance)
+        return attendance
+
+    async def _record(self, username: str, error: Exception | None) -> None:
+        """Persist the outcome of a sync and schedule the next one."""
+        async with database.Session() as db:
+            user = await db.get(models.Users, username)
+            if user is None:
+                return
+            if error is None:
+                user.ConsecutiveFailures = 0
+                user.LastSyncedAt = utcnow()
+                user.LastSyncStatus = "success"
+                user.LastSyncError = None
+            else:
+                user.ConsecutiveFailures = (user.ConsecutiveFailures or 0) + 1
+                user.LastSyncStatus = "error"
+                user.LastSyncError = str(getattr(error, "detail", error))[:1000]
+            user.NextSyncAt = self.next_sync_at(user.ConsecutiveFailures)
+            await db.commit()
+
+    async def _worker(self) -> None:
+        while True:
+            username, password = await self._queue.get()
+            self._busy += 1
+            error = None
+            try:
+                await self.sync_user(username, password)
+                self.synced += 1
+            except Exception as e:
+                error = e
+                self.failed += 1
+                logger.error(f"Error in syncing attendance of {username}: {getattr(e, 'detail', e)}")
+            finally:
+                try:
+                    await self._record(username, error)
+                except Exception as e:
+                    logger.error(f"Error in saving sync progress of {username}: {e}")
+                self._busy -= 1
+                self._queue.task_done()
+                self._wakeup.set()
+
+    async def _scheduler(self) -> None:
+        while True:
+            try:
+                await self.schedule_new_users()
+                free = self.max_concurrent_users - self._busy - self._queue.qsize()
+                if free > 0:
+                    for user in await self.claim_due_users(free):
+                        self._queue.put_nowait(user)
+            except Exception as e:
+                logger.error(f"Error in attendance sync scheduler: {e}")
+
+            # Wait for the next poll, or until a worker frees up
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict[str, int]:
+        """Worker pool usage and sync counters."""
+        return {
+            "max_concurrent_users": self.max_concurrent_users,
+            "busy": self._busy,
+            "queued": self._queue.qsize(),
+            "synced": self.synced,
+            "failed": self.failed,
+        }
+
+    def start(self) -> None:
+        """Start the scheduler and the worker pool."""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._scheduler())] + [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrent_users)
+        ]
+        logger.info(f"Attendance Sync Started with {self.max_concurrent_users} Workers")
+
+    async def stop(self) -> None:
+        """Stop the scheduler and the worker pool."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+sync_engine = AttendanceSyncEngine()
+sync_engine.add_hook(diff_engine.on_sync)
@@ -0,0 +1,124 @@
+# Path: app/utils/timetable_store.py
+# Description: Holds the class timetable in memory and on disk, and fetches it from the portal in the background.
+
+import os
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.logging import logger
+from app.config import settings
+from app.utils import atomic_write, database
+from app.utils.session_pool import session_pool
+
+
+class TimetableStore:
+    """The timetable served by `GET /timetable/`.
+
+    On startup the copy on disk is used if there is one. Otherwise a background task fetches it from the
+    portal, retrying with exponential backoff, so the server starts serving other endpoints right away.
+    `ready` is set once a timetable is available.
+
+    The timetable is also kept encoded as the JSON response body, plain and gzipped, with an ETag
+    derived from its content, so requests don't serialize it again.
+    """
+    def __init__(
+        self,
+        path: str = settings.TIMETABLE_CACHE_PATH,
+        backoff: float = settings.TIMETABLE_WARMUP_BACKOFF_SECONDS,
+        max_backoff: float = settings.TIMETABLE_WARMUP_MAX_BACKOFF_SECONDS,
+    ) -> None:
+        self.path = path
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.timetable: dict | None = None
+        self.body: bytes = b""
+        self.body_gzip: bytes = b""
+        self.etag: str = ""
+        self.updated_at: float | None = None
+        self.ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        # Metrics
+        self.warmup_attempts = 0
+
+    def load(self) -> bool:
+        """Load the timetable from disk, if there is a readable copy."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r") as f:
+                # Caches written by the old pandas parser have `NaN` for empty slots
+                timetable = json.loads(f.read(), parse_constant=lambda constant: None)
+            self.set(timetable, updated_at=os.path.getmtime(self.path))
+        except (OSError, ValueError, TypeError) as e:
+            # Fetched again by the background warm-up
+            logger.error(f"Error in reading cached timetable: {e}")
+            return False
+        return True
+
+    def set(self, timetable: dict, updated_at: float | None = None) -> None:
+        # Same encoding as FastAPI's JSONResponse
+        body = json.dumps(timetable, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+        self.body = body
+        self.body_gzip = gzip.compress(body, mtime=0)
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.timetable = timetable
+        self.updated_at = updated_at or time.time()
+        self.ready.set()
+
+    async def refresh(self, db: AsyncSession | None = None) -> dict:
+        """Fetch the timetable from the portal, and keep it in memory and on disk."""
+        async with session_pool.session() as am:
+            if db is None:
+                async with database.Session() as db:
+                    timetable = await am.get_timetable(db)
+            else:
+                timetable = await am.get_timetable(db)
+
+        # Write to a temporary file and rename, so a crash can't leave a partial cache behind
+        await asyncio.to_thread(atomic_write, self.path, json.dumps(timetable, indent=4))
+        self.set(timetable)
+        logger.info("Timetable Cached")
+        return timetable
+
+    async def _warm_up(self) -> None:
+        delay = self.backoff
+        while True:
+            self.warmup_attempts += 1
+            try:
+                await self.refresh()
+                return
+            except Exception as e:
+                logger.error(f"Error in caching timetable: {getattr(e, 'detail', e)}, retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+            delay = min(self.max_backoff, delay * 2)
+
+    def start(self) -> None:
+        """Load the timetable from disk, or start fetching it in the background."""
+        if self.load():
+            logger.info("Timetable Cached")
+        elif self._task is None:
+            self._task = asyncio.create_task(self._warm_up())
+
+    async def stop(self) -> None:
+        """Stop the background fetch, if it is still running."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict[str, bool | float | int | None]:
+        """Readiness and age of the timetable."""
+        return {
+            "ready": self.ready.is_set(),
+            "age": None if self.updated_at is None else round(time.time() - self.updated_at, 1),
+            "warmup_attempts": self.warmup_attempts,
+        }
+
+
+timetable_store = TimetableStore()
@@ -0,0 +1,327 @@
+# Path: app/utils/webhooks.py
+# Description: Delivers new notifications to registered webhook targets, with batching, retries and a dead-letter table.
+
+import json
+import socket
+import random
+import asyncio
+import ipaddress
+from urllib.parse import urlsplit
+import httpx
+import httpcore
+from sqlalchemy import select, insert
+
+from app.logging import logger
+from app.config import settings
+from app.utils import database, models
+from app.utils.data_models import NotificationModel
+from app.utils.notifications import notifications, notification_model
+
+
+def notification_message(notification: NotificationModel) -> str:
+    """Human readable text of a notification."""
+    return (
+        f"You have been marked {notification.type} in {notification.subject} for {notification.num_lectures} lectures. "
+        f"Your attendance has changed from {notification.previous_attendance_percentage}% on {notification.previous_date} "
+        f"at {notification.previous_time} to {notification.current_attendance_percentage}% on {notification.current_date} "
+        f"at {notification.current_time}"
+    )
+
+
+def webhook_payload(batch: list[models.Notifications]) -> bytes:
+    """JSON body for one webhook request, with a ready to show `message` and the notifications themselves."""
+    batch = [notification_model(notification) for notification in batch]
+    return json.dumps({
+        "message": "\n".join(notification_message(notification) for notification in batch),
+        "notifications": [notification.model_dump(mode="json", exclude={"username"}) for notification in batch],
+    }).encode()
+
+
+class WebhookURLError(ValueError):
+    """A webhook URL that must not be called."""
+
+
+def webhook_host(url: str) -> tuple[str, int]:
+    """Host and port of a webhook URL. Rejects URLs that are not http(s) or not on `WEBHOOK_ALLOWED_HOSTS`."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookURLError(f"Invalid Webhook URL {url}")
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        raise WebhookURLError(f"Invalid Webhook URL {url}")
+
+    host = parts.hostname.rstrip(".").lower()
+    allowed_hosts = [allowed.rstrip(".").lower() for allowed in settings.WEBHOOK_ALLOWED_HOSTS]
+    if allowed_hosts and not any(host == allowed or host.endswith(f".{allowed}") for allowed in allowed_hosts):
+        raise WebhookURLError(f"Webhook host {host} is not allowed")
+    return host, port
+
+
+async def public_addresses(host: str, port: int) -> list[str]:
+    """Resolve `host` and return its addresses, if all of them are public.
+
+    Loopback, private, link-local (including cloud metadata at 169.254.169.254), reserved and multicast addresses
+    are rejected, so targets cannot reach the service's own network. Raises `WebhookURLError`, or `OSError` if the
+    host cannot be resolved.
+    """
+    addresses = []
+    for *_, sockaddr in await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM):
+        address = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise WebhookURLError(f"Webhook host {host} resolves to non-public address {address}")
+        if str(address) not in addresses:
+            addresses.append(str(address))
+    return addresses
+
+
+async def check_webhook_url(url: str) -> None:
+    """Check a webhook URL when it is registered (see `webhook_host` and `public_addresses`).
+
+    Addresses are not checked if `WEBHOOK_ALLOW_PRIVATE_ADDRESSES` is set.
+    """
+    host, port = webhook_host(url)
+    if not settings.WEBHOOK_ALLOW_PRIVATE_ADDRESSES:
+        await public_addresses(host, port)
+
+
+class PublicNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Connects to the addresses `public_addresses` checked, instead of resolving the host a second time.
+
+    A host cannot pass the check with a public address and then be connected to on a private one (DNS rebinding).
+    TLS still verifies the certificate for the host name, and the Host header is unchanged.
+    """
+    def __init__(self) -> None:
+        self.backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            addresses = await public_addresses(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(f"Could not resolve {host}: {e}") from e
+
+        error = None
+        for address in addresses:
+            try:
+                return await self.backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        raise httpcore.ConnectError("Webhooks cannot be sent to unix sockets")
+
+    async def sleep(self, seconds: float) -> None:
+        await self.backend.sleep(seconds)
+
+
+class WebhookTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport whose connections go through `PublicNetworkBackend`."""
+    def __init__(self, limits: httpx.Limits) -> None:
+        super().__init__(limits=limits, trust_env=False)
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(trust_env=False),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=PublicNetworkBackend(),
+        )
+
+
+class WebhookDelivery:
+    """Sends new notifications to the webhook targets of their users.
+
+    - New notifications are collected for `batch_wait` seconds, then the targets of all their users are
+      loaded with one query, and every target gets its notifications in requests of up to `BatchSize`.
+    - Requests go out concurrently over one pooled client, at most `max_concurrency` at a time.
+    - Failed requests (connection errors, timeouts, 408, 429 and 5xx) are retried with exponential backoff
+      and jitter. Requests that still fail after `max_attempts` (or get any other 4xx) are stored in
+      `webhook_dead_letters`.
+    - The host is checked against `WEBHOOK_ALLOWED_HOSTS` before every attempt, and every connection goes to
+      the addresses `public_addresses` just checked (see `PublicNetworkBackend`), so a host that resolves to a
+      private address after it was registered is not called. Redirects and proxy settings are not followed.
+    - On shutdown, queued notifications are still sent, deliveries get `shutdown_timeout` seconds to finish,
+      and whatever is left is stored in `webhook_dead_letters`.
+    """
+    def __init__(
+        self,
+        max_concurrency: int = settings.WEBHOOK_MAX_CONCURRENCY,
+        max_batch_size: int = settings.WEBHOOK_MAX_BATCH_SIZE,
+        batch_wait: float = settings.WEBHOOK_BATCH_WAIT_SECONDS,
+        timeout: float = settings.WEBHOOK_TIMEOUT_SECONDS,
+        max_attempts: int = settings.WEBHOOK_MAX_ATTEMPTS,
+        backoff: float = settings.WEBHOOK_BACKOFF_SECONDS,
+        max_backoff: float = settings.WEBHOOK_MAX_BACKOFF_SECONDS,
+        shutdown_timeout: float = settings.WEBHOOK_SHUTDOWN_TIMEOUT_SECONDS,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_batch_size = max_batch_size
+        self.batch_wait = batch_wait
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.shutdown_timeout = shutdown_timeout
+
+        self.client: httpx.AsyncClient | None = None
+        self._pending: list[models.Notifications] = []
+        self._ready = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._dispatcher: asyncio.Task | None = None
+        self._deliveries: set[asyncio.Task] = set()
+
+        # Metrics
+        self.delivered = 0
+        self.retries = 0
+        self.dead_letters = 0
+
+    def enqueue(self, inserted: list[models.Notifications]) -> None:
+        """Queue newly stored notifications for delivery."""
+        if self._dispatcher is None:
+            return
+        self._pending.extend(inserted)
+        self._ready.set()
+
+    async def dispatch(self, pending: list[models.Notifications]) -> None:
+        """Start one delivery per target and batch."""
+        by_username: dict[str, list[models.Notifications]] = {}
+        for notification in pending:
+            by_username.setdefault(notification.Username, []).append(notification)
+
+        async with database.Session() as db:
+            targets = (await db.scalars(
+                select(models.WebhookTargets).where(models.WebhookTargets.Username.in_(by_username))
+            )).all()
+
+        for target in targets:
+            user_notifications = by_username[target.Username]
+            size = max(1, min(target.BatchSize, self.max_batch_size))
+            for start in range(0, len(user_notifications), size):
+                payload = webhook_payload(user_notifications[start:start + size])
+                task = asyncio.create_task(self.deliver(target.Id, target.Url, payload))
+                self._deliveries.add(task)
+                task.add_done_callback(self._deliveries.discard)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, so retries of many targets do not line up."""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    async def deliver(self, target_id: int, url: str, payload: bytes) -> bool:
+        """POST `payload` to `url`, retrying until it succeeds or `max_attempts` is reached."""
+        error, attempt = None, 0
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    async with self._semaphore:
+                        webhook_host(url)
+                        response = await self.client.post(url, content=payload, headers={"Content-Type": "application/json"})
+                    if response.is_success:
+                        self.delivered += 1
+                        return True
+                    error = f"HTTP {response.status_code}"
+                    # Other client errors will not go away by retrying
+                    if response.status_code < 500 and response.status_code not in (408, 429):
+                        break
+                except WebhookURLError as e:
+                    error = str(e)
+                    break
+                except (httpx.HTTPError, OSError) as e:
+                    error = f"{type(e).__name__}: {e}"
+
+                if attempt < self.max_attempts:
+                    self.retries += 1
+                    await asyncio.sleep(self.backoff_delay(attempt))
+        except asyncio.CancelledError:
+            # Cancelled by `stop`, keep the payload so it can be sent again
+            await self.dead_letter(target_id, url, payload, attempt, error or "Not delivered before shutdown")
+            raise
+
+        await self.dead_letter(target_id, url, payload, attempt, error)
+        return False
+
+    async def dead_letter(self, target_id: int, url: str, payload: bytes, attempts: int, error: str | None) -> None:
+        """Store a request that could not be delivered."""
+        self.dead_letters += 1
+        logger.error(f"Error in delivering webhook to {url} after {attempts} attempts: {error}")
+        try:
+            async with database.Session() as db:
+                await db.execute(insert(models.WebhookDeadLetters).values(
+                    TargetId=target_id,
+                    Url=url,
+                    Payload=payload.decode(),
+                    Attempts=attempts,
+                    LastError=error,
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error in saving webhook dead letter for {url}: {e}")
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            await self._ready.wait()
+            # Wait a little, so the notifications of one sync batch go out together
+            await asyncio.sleep(self.batch_wait)
+            self._ready.clear()
+            pending, self._pending = self._pending, []
+            try:
+                await self.dispatch(pending)
+            except asyncio.CancelledError:
+                # Stopped while loading targets, `stop` dispatches them again
+                self._pending[:0] = pending
+                raise
+            except Exception as e:
+                logger.error(f"Error in dispatching webhooks: {e}")
+
+    def stats(self) -> dict[str, int]:
+        """Queue lengths and delivery counters."""
+        return {
+            "pending": len(self._pending),
+            "in_flight": len(self._deliveries),
+            "delivered": self.delivered,
+            "retries": self.retries,
+            "dead_letters": self.dead_letters,
+        }
+
+    def start(self) -> None:
+        """Create the HTTP client and start delivering."""
+        if self._dispatcher is not None:
+            return
+        limits = httpx.Limits(max_connections=self.max_concurrency)
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            # Connect only to checked public addresses, unless private ones are allowed
+            transport=None if settings.WEBHOOK_ALLOW_PRIVATE_ADDRESSES else WebhookTransport(limits),
+            limits=limits,
+            trust_env=settings.WEBHOOK_ALLOW_PRIVATE_ADDRESSES,
+        )
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self) -> None:
+        """Send what is queued, wait up to `shutdown_timeout` for deliveries, dead-letter the rest and close the HTTP client."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+            pending, self._pending = self._pending, []
+            if pending:
+                try:
+                    await self.dispatch(pending)
+                except Exception as e:
+                    logger.error(f"Error in dispatching webhooks on shutdown: {e}")
+
+        tasks = list(self._deliveries)
+        if tasks:
+            _, unfinished = await asyncio.wait(tasks, timeout=self.shutdown_timeout)
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+webhook_delivery = WebhookDelivery()
+notifications.add_listener(webhook_delivery.enqueue)
@@ -0,0 +1,86 @@
+# Path: benchmarks/captcha_benchmark.py
+# Description: Offline accuracy and latency benchmark for the captcha solvers over a corpus of saved captcha images.
+#
+# The corpus is a directory of captcha images named after their text, e.g. `AB12C.png` or `AB12C_2.png`.
+#
+# Usage:
+#   python -m app.utils.captcha_solver <train-corpus> cache/captcha_glyphs.npz   # build glyph set
+#   python benchmarks/captcha_benchmark.py <test-corpus> [--solver template tesseract] [--json]
+
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils.captcha_solver import CaptchaSolver, TemplateCaptchaSolver, TesseractCaptchaSolver, FallbackCaptchaSolver
+
+
+def load_corpus(corpus: Path) -> list[tuple[str, bytes]]:
+    """Load `(expected text, image bytes)` pairs from a corpus directory."""
+    return [
+        (path.stem.split("_")[0], path.read_bytes())
+        for path in sorted(corpus.iterdir())
+        if path.is_file() and path.suffix.lower() in (".png", ".jpg", ".jpeg", ".gif", ".bmp")
+    ]
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def benchmark(solver: CaptchaSolver, corpus: list[tuple[str, bytes]]) -> dict[str, float | int | str]:
+    """Solve every captcha once and report solve rate and time per captcha."""
+    timings, solved, answered = [], 0, 0
+    for expected, content in corpus:
+        start = time.perf_counter()
+        text = solver.solve(content)
+        timings.append(time.perf_counter() - start)
+        answered += text is not None
+        solved += text == expected
+
+    return {
+        "solver": solver.name,
+        "captchas": len(corpus),
+        "answered": answered,
+        "solved": solved,
+        "solve_rate": solved / len(corpus),
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "max_ms": max(timings) * 1000,
+    }
+
+
+SOLVERS = {
+    "template": lambda: TemplateCaptchaSolver(),
+    "tesseract": lambda: TesseractCaptchaSolver(),
+    "fallback": lambda: FallbackCaptchaSolver(TemplateCaptchaSolver(), TesseractCaptchaSolver()),
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Captcha solver accuracy and latency benchmark")
+    parser.add_argument("corpus", type=Path, help="Directory of captcha images named after their text")
+    parser.add_argument("--solver", nargs="+", choices=SOLVERS, default=["template", "tesseract"])
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        sys.exit(f"No captcha images found in {args.corpus}")
+
+    results = [benchmark(SOLVERS[name](), corpus) for name in args.solver]
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        for result in results:
+            print(
+                f"{result['solver']:<20} solved {result['solved']}/{result['captchas']} ({result['solve_rate']:.1%})"
+                f"  mean {result['mean_ms']:.2f} ms  p50 {result['p50_ms']:.2f} ms"
+                f"  p95 {result['p95_ms']:.2f} ms  max {result['max_ms']:.2f} ms"
+            )
@@ -0,0 +1,121 @@
+# Path: benchmarks/import_time.py
+# Description: Cold-start import time check, tracks how long importing the app and each of its modules takes.
+#
+# Every round imports the module in a fresh interpreter with `python -X importtime` (after one warm-up run that
+# writes the bytecode cache), and the fastest round per module is reported. Settings are read from the
+# environment / `.env` as usual, but no database or portal connection is needed.
+#
+# Usage:
+#   python benchmarks/import_time.py [--module app] [--rounds 5] [--budget-ms 1500]
+#       [--module-budget app.utils.attendance_manager=600] [--forbid numpy PIL ...] [--json]
+#
+# Exits with status 1 if a budget is exceeded or a forbidden (lazily loaded) module is imported.
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Heavy dependencies that must only be loaded on first use, not when the app is imported
+LAZY_MODULES = ["numpy", "PIL", "pytesseract", "lxml", "pandas", "bs4", "sqlalchemy_utils"]
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Import `module` in a fresh interpreter and return `{module: (self us, cumulative us)}` of everything it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            times[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return times
+
+
+def measure(module: str, rounds: int) -> dict[str, tuple[int, int]]:
+    """Fastest self/cumulative time per imported module over `rounds` cold imports."""
+    import_times(module)  # Warm-up, writes `__pycache__`
+    best: dict[str, tuple[int, int]] = {}
+    for _ in range(rounds):
+        for name, (own, cumulative) in import_times(module).items():
+            if name not in best or cumulative < best[name][1]:
+                best[name] = (own, cumulative)
+    return best
+
+
+def parse_budget(value: str) -> tuple[str, float]:
+    name, _, milliseconds = value.partition("=")
+    if not name or not milliseconds:
+        raise argparse.ArgumentTypeError(f"expected MODULE=MS, got {value!r}")
+    return name, float(milliseconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start import time check")
+    parser.add_argument("--module", default="app", help="Module to import")
+    parser.add_argument("--rounds", type=int, default=5, help="Cold imports to take the fastest of")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Budget for importing --module")
+    parser.add_argument("--module-budget", type=parse_budget, action="append", default=[], metavar="MODULE=MS",
+                        help="Budget for one imported module, can be repeated")
+    parser.add_argument("--forbid", nargs="*", default=LAZY_MODULES, help="Modules that must not be imported")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    times = measure(args.module, args.rounds)
+    if args.module not in times:
+        sys.exit(f"{args.module} was not imported, is it already imported by the interpreter?")
+
+    # The app's own modules, slowest first
+    project = sorted(
+        ((name, cumulative / 1000, own / 1000) for name, (own, cumulative) in times.items() if name.split(".")[0] == args.module.split(".")[0]),
+        key=lambda row: row[1],
+        reverse=True,
+    )
+
+    violations = []
+    total_ms = times[args.module][1] / 1000
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        violations.append(f"{args.module} took {total_ms:.1f} ms, budget {args.budget_ms:.1f} ms")
+    for name, budget in args.module_budget:
+        if name not in times:
+            continue
+        milliseconds = times[name][1] / 1000
+        if milliseconds > budget:
+            violations.append(f"{name} took {milliseconds:.1f} ms, budget {budget:.1f} ms")
+    for name in args.forbid:
+        if name in times:
+            violations.append(f"{name} is imported on startup, it should only be imported on first use")
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "python": sys.version.split()[0],
+            "rounds": args.rounds,
+            "total_ms": total_ms,
+            "modules": [{"module": name, "cumulative_ms": cumulative, "self_ms": own} for name, cumulative, own in project],
+            "violations": violations,
+        }, indent=4))
+    else:
+        print(f"import {args.module}: {total_ms:.1f} ms (fastest of {args.rounds} cold imports)")
+        for name, cumulative, own in project[:args.top]:
+            print(f"  {name:<45} {cumulative:8.1f} ms  (self {own:.1f} ms)")
+        for violation in violations:
+            print(f"FAIL: {violation}")
+
+    sys.exit(1 if violations else 0)
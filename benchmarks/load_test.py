@@ -0,0 +1,174 @@
+# Path: benchmarks/load_test.py
+# Description: HTTP load driver for the running app, reports latency percentiles and throughput per endpoint.
+#
+# Run the app against `benchmarks/mock_portal.py` (see there) so the load never reaches the real portal.
+# `--concurrency` workers send requests back to back, cycling through the endpoints. With `--rate`, requests are
+# sent on a fixed schedule instead, and latency is measured from the scheduled time, so a slow server is not
+# hidden by requests that were sent late (coordinated omission). Requests in the first `--warmup` seconds are not
+# counted. Set `ATTENDANCE_CACHE_TTL=0` on the app to send every attendance request through to the portal.
+#
+# Usage:
+#   python benchmarks/load_test.py [--url http://127.0.0.1:8000] [--endpoint "GET /timetable/" ...]
+#       [--concurrency 50] [--duration 30] [--rate 200] [--warmup 2] [--json] [--output results.json]
+#
+# An endpoint is "METHOD PATH", optionally followed by a form body, e.g. "POST /notifications/unread username=ra2111".
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+import statistics
+from collections import Counter
+from urllib.parse import parse_qsl
+
+import httpx
+
+DEFAULT_ENDPOINTS = ["GET /timetable/", "POST /attendance/", "GET /health/ready"]
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def parse_endpoint(value: str) -> tuple[str, str, dict[str, str] | None]:
+    parts = value.split(maxsplit=2)
+    if len(parts) < 2:
+        raise argparse.ArgumentTypeError(f"expected 'METHOD PATH [form]', got {value!r}")
+    form = dict(parse_qsl(parts[2])) if len(parts) > 2 else None
+    return parts[0].upper(), parts[1], form
+
+
+class LoadTest:
+    """Sends requests to the endpoints for `duration` seconds and records (endpoint, status, latency)."""
+    def __init__(self, url: str, endpoints: list[tuple[str, str, dict | None]], concurrency: int, duration: float,
+                 rate: float | None, warmup: float, timeout: float) -> None:
+        self.url = url
+        self.endpoints = endpoints
+        self.concurrency = concurrency
+        self.duration = duration
+        self.rate = rate
+        self.warmup = warmup
+        self.timeout = timeout
+        self.samples: list[tuple[str, str, float]] = []
+        self._next = itertools.cycle(endpoints)
+        self._sent = 0
+
+    def next_request(self, now: float) -> tuple[tuple[str, str, dict | None], float] | None:
+        """The next endpoint and when to send it, or None once the test is over."""
+        if self.rate:
+            scheduled = self.started_at + self._sent / self.rate
+            self._sent += 1
+        else:
+            scheduled = now
+        if scheduled >= self.started_at + self.duration:
+            return None
+        return next(self._next), scheduled
+
+    async def worker(self, client: httpx.AsyncClient) -> None:
+        while (job := self.next_request(time.perf_counter())) is not None:
+            (method, path, form), scheduled = job
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                response = await client.request(method, path, data=form)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            finished = time.perf_counter()
+
+            if scheduled >= self.started_at + self.warmup:
+                self.samples.append((f"{method} {path}", status, finished - scheduled))
+
+    async def run(self) -> None:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.url, limits=limits, timeout=self.timeout) as client:
+            self.started_at = time.perf_counter()
+            await asyncio.gather(*(self.worker(client) for _ in range(self.concurrency)))
+
+    def report(self) -> dict[str, dict]:
+        """Latency percentiles, throughput and status counts per endpoint, and over all endpoints."""
+        measured = max(self.duration - self.warmup, 1e-9)
+        groups: dict[str, list[tuple[str, float]]] = {f"{method} {path}": [] for method, path, _ in self.endpoints}
+        for endpoint, status, latency in self.samples:
+            groups[endpoint].append((status, latency))
+        groups["total"] = [(status, latency) for _, status, latency in self.samples]
+
+        results = {}
+        for endpoint, samples in groups.items():
+            if not samples:
+                results[endpoint] = {"requests": 0}
+                continue
+            latencies = [latency for _, latency in samples]
+            statuses = Counter(status for status, _ in samples)
+            errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+            results[endpoint] = {
+                "requests": len(samples),
+                "throughput_rps": len(samples) / measured,
+                "error_rate": errors / len(samples),
+                "statuses": dict(sorted(statuses.items())),
+                "mean_ms": statistics.fmean(latencies) * 1000,
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p95_ms": percentile(latencies, 0.95) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000,
+                "max_ms": max(latencies) * 1000,
+            }
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP load driver for the app")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running app")
+    parser.add_argument("--endpoint", type=parse_endpoint, action="append", default=None, metavar="'METHOD PATH [form]'",
+                        help="Endpoint to load, can be repeated (default: timetable, attendance and readiness)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent requests in flight at most")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to send requests for")
+    parser.add_argument("--rate", type=float, default=None, help="Requests per second over all endpoints (default: as fast as possible)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds at the start that are not counted")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--output", default=None, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    if args.warmup >= args.duration:
+        sys.exit("--warmup must be shorter than --duration")
+
+    test = LoadTest(
+        args.url,
+        args.endpoint or [parse_endpoint(endpoint) for endpoint in DEFAULT_ENDPOINTS],
+        args.concurrency,
+        args.duration,
+        args.rate,
+        args.warmup,
+        args.timeout,
+    )
+    asyncio.run(test.run())
+
+    results = {
+        "url": args.url,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "rate": args.rate,
+        "endpoints": test.report(),
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        for endpoint, result in results["endpoints"].items():
+            if not result["requests"]:
+                print(f"{endpoint:<32} no requests")
+                continue
+            statuses = " ".join(f"{status}:{count}" for status, count in result["statuses"].items())
+            print(
+                f"{endpoint:<32} {result['throughput_rps']:8.1f} req/s  p50 {result['p50_ms']:8.1f} ms"
+                f"  p95 {result['p95_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  errors {result['error_rate']:.1%}  [{statuses}]"
+            )
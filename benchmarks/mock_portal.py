@@ -0,0 +1,238 @@
+# Path: benchmarks/mock_portal.py
+# Description: Local stand-in for the SRM Student Portal, for load testing the app without touching the real portal.
+#
+# Serves the portal pages `AttendanceManager` uses from the recorded pages in `benchmarks/fixtures`, with portal
+# sessions (cookie), generated captchas that are checked on login, and report pages that redirect to the login
+# page when the session is missing or expired. Latency, error rate and captcha failure rate are configurable.
+#
+# Captchas are drawn with Pillow's built-in font, so `--glyphs` can write a glyph set for the template solver
+# that reads them. Point the app at the mock with:
+#
+#   python benchmarks/mock_portal.py --port 8800 --latency-ms 150 --jitter-ms 50 --error-rate 0.01 \
+#       --captcha-failure-rate 0.2 --glyphs cache/mock_captcha_glyphs.npz
+#   PORTAL_BASE_URL=http://127.0.0.1:8800/srmiststudentportal CAPTCHA_SOLVER=template \
+#       CAPTCHA_GLYPHS_PATH=cache/mock_captcha_glyphs.npz uvicorn app:app
+#
+# `GET /_mock/stats` returns request counts per page and status, and `POST /_mock/stats/reset` clears them.
+
+import io
+import sys
+import time
+import random
+import string
+import asyncio
+import argparse
+import secrets
+from collections import Counter, OrderedDict
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse, Response
+from starlette.routing import Route
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+BASE_PATH = "/srmiststudentportal"
+LOGIN_PATH = f"{BASE_PATH}/students/loginManager/youLogin.jsp"
+HOME_PATH = f"{BASE_PATH}/students/template/HRDSystem.jsp"
+SESSION_COOKIE = "JSESSIONID"
+
+# Characters that Pillow's built-in font draws as exactly one connected glyph (`I` is too thin, `W` splits)
+CAPTCHA_ALPHABET = "".join(c for c in string.ascii_uppercase + string.digits if c not in "IOW01")
+CAPTCHA_LENGTH = 5
+
+
+def render_captcha(text: str) -> bytes:
+    """Draw `text` as a PNG captcha, one character per cell with a little vertical jitter."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.load_default()
+    image = Image.new("L", (14 * len(text) + 12, 30), 255)
+    draw = ImageDraw.Draw(image)
+    for i, character in enumerate(text):
+        draw.text((6 + 14 * i, 8 + random.randint(-3, 3)), character, fill=0, font=font)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def build_glyphs(glyphs_path: str) -> int:
+    """Write a template solver glyph set that reads the mock's captchas."""
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from app.utils.captcha_solver import TemplateCaptchaSolver
+
+    samples = [(c * CAPTCHA_LENGTH, render_captcha(c * CAPTCHA_LENGTH)) for c in CAPTCHA_ALPHABET for _ in range(3)]
+    return TemplateCaptchaSolver.build(samples, glyphs_path)
+
+
+class MockPortal:
+    """ASGI app that answers the requests `AttendanceManager` makes, the way the portal does.
+
+    - Every request waits `latency` ± `jitter` seconds, and `error_rate` of them are answered with a 503.
+    - `GET captchas` issues a new captcha for the session. A login `POST` succeeds (302) only with that
+      captcha's text, and `captcha_failure_rate` of correct answers are rejected anyway ("Invalid Captcha....").
+    - Report pages need a logged in session not older than `session_ttl` seconds, otherwise they redirect
+      to the login page, which makes the app log in again.
+    """
+    def __init__(
+        self,
+        fixtures: Path = FIXTURES,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        captcha_failure_rate: float = 0.0,
+        session_ttl: float = 900.0,
+        max_sessions: int = 100_000,
+    ) -> None:
+        self.pages = {name: (fixtures / f"{name}.html").read_bytes() for name in ("login", "attendance", "monthly_absent", "timetable")}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.captcha_failure_rate = captcha_failure_rate
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+
+        # Session id -> {"captcha": str | None, "logged_in_at": float | None}, oldest first
+        self.sessions: OrderedDict[str, dict] = OrderedDict()
+        self.requests: Counter[tuple[str, int]] = Counter()
+        self.started_at = time.monotonic()
+
+        report = f"{BASE_PATH}/students/report"
+        self.app = Starlette(routes=[
+            Route(LOGIN_PATH, self.login_page, methods=["GET"]),
+            Route(LOGIN_PATH, self.login, methods=["POST"]),
+            Route(f"{BASE_PATH}/captchas", self.captcha, methods=["GET"]),
+            Route(HOME_PATH, self.home, methods=["GET"]),
+            Route(f"{report}/studentAttendanceDetails.jsp", self.report("attendance"), methods=["GET", "POST"]),
+            Route(f"{report}/studentAttendanceDetailsInner.jsp", self.report("monthly_absent"), methods=["GET", "POST"]),
+            Route(f"{report}/studentTimeTableDetails.jsp", self.report("timetable"), methods=["GET", "POST"]),
+            Route("/_mock/stats", self.stats, methods=["GET"]),
+            Route("/_mock/stats/reset", self.reset_stats, methods=["POST"]),
+        ])
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/_mock/"):
+            await self.app(scope, receive, send)
+            return
+
+        delay = max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+        if delay:
+            await asyncio.sleep(delay)
+
+        page = scope["path"].rsplit("/", 1)[-1]
+        if random.random() < self.error_rate:
+            self.requests[(page, 503)] += 1
+            await Response("Service Unavailable", status_code=503)(scope, receive, send)
+            return
+
+        async def count_status(message) -> None:
+            if message["type"] == "http.response.start":
+                self.requests[(page, message["status"])] += 1
+            await send(message)
+
+        await self.app(scope, receive, count_status)
+
+    def session(self, request: Request) -> tuple[str, dict, bool]:
+        """The request's portal session, created if the cookie is missing or unknown. Returns (id, session, created)."""
+        session_id = request.cookies.get(SESSION_COOKIE)
+        if session_id in self.sessions:
+            return session_id, self.sessions[session_id], False
+
+        session_id = secrets.token_hex(16)
+        self.sessions[session_id] = {"captcha": None, "logged_in_at": None}
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        return session_id, self.sessions[session_id], True
+
+    @staticmethod
+    def with_cookie(response: Response, session_id: str, created: bool) -> Response:
+        if created:
+            response.set_cookie(SESSION_COOKIE, session_id, path=BASE_PATH, httponly=True)
+        return response
+
+    async def login_page(self, request: Request) -> Response:
+        session_id, _, created = self.session(request)
+        return self.with_cookie(Response(self.pages["login"], media_type="text/html"), session_id, created)
+
+    async def captcha(self, request: Request) -> Response:
+        session_id, session, created = self.session(request)
+        session["captcha"] = "".join(random.choices(CAPTCHA_ALPHABET, k=CAPTCHA_LENGTH))
+        return self.with_cookie(Response(render_captcha(session["captcha"]), media_type="image/png"), session_id, created)
+
+    async def login(self, request: Request) -> Response:
+        session_id, session, created = self.session(request)
+        form = {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+
+        # A captcha can only be used once, like on the portal
+        expected, session["captcha"] = session["captcha"], None
+
+        if not form.get("txtAN") or not form.get("txtSK"):
+            body = self.pages["login"].replace(b"</body>", b"<p>Login Error : Invalid net id or password</p></body>")
+            return self.with_cookie(Response(body, media_type="text/html"), session_id, created)
+
+        if expected is None or form.get("hdnCaptcha") != expected or random.random() < self.captcha_failure_rate:
+            body = self.pages["login"].replace(b"</body>", b"<p>Invalid Captcha....</p></body>")
+            return self.with_cookie(Response(body, media_type="text/html"), session_id, created)
+
+        session["logged_in_at"] = time.monotonic()
+        return self.with_cookie(RedirectResponse(HOME_PATH, status_code=302), session_id, created)
+
+    async def home(self, request: Request) -> Response:
+        return Response(b"<html><body>Welcome</body></html>", media_type="text/html")
+
+    def report(self, name: str):
+        async def page(request: Request) -> Response:
+            session = self.sessions.get(request.cookies.get(SESSION_COOKIE))
+            logged_in_at = session and session["logged_in_at"]
+            if logged_in_at is None or time.monotonic() - logged_in_at > self.session_ttl:
+                return RedirectResponse(LOGIN_PATH, status_code=302)
+            await request.body()
+            return Response(self.pages[name], media_type="text/html")
+        return page
+
+    async def stats(self, request: Request) -> JSONResponse:
+        pages: dict[str, dict[str, int]] = {}
+        for (page, status), count in sorted(self.requests.items()):
+            pages.setdefault(page, {})[str(status)] = count
+        return JSONResponse({
+            "uptime_seconds": time.monotonic() - self.started_at,
+            "sessions": len(self.sessions),
+            "logged_in_sessions": sum(session["logged_in_at"] is not None for session in self.sessions.values()),
+            "requests": pages,
+        })
+
+    async def reset_stats(self, request: Request) -> Response:
+        self.requests.clear()
+        self.started_at = time.monotonic()
+        return Response(status_code=204)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local mock of the SRM Student Portal")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES, help="Directory with the recorded pages")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Latency varies uniformly by up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 503")
+    parser.add_argument("--captcha-failure-rate", type=float, default=0.0, help="Share of correct captchas rejected anyway")
+    parser.add_argument("--session-ttl", type=float, default=900.0, help="Seconds until a portal session expires")
+    parser.add_argument("--glyphs", default=None, help="Write a template solver glyph set for the mock captchas to this path")
+    args = parser.parse_args()
+
+    if args.glyphs:
+        print(f"Saved {build_glyphs(args.glyphs)} glyphs to {args.glyphs}")
+
+    portal = MockPortal(
+        fixtures=args.fixtures,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        captcha_failure_rate=args.captcha_failure_rate,
+        session_ttl=args.session_ttl,
+    )
+    uvicorn.run(portal, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,222 @@
+# Path: benchmarks/pipeline_benchmark.py
+# Description: Offline benchmark of every stage of the portal scraping pipeline, replayed from recorded pages.
+#
+# The portal is replaced by an `httpx.MockTransport` serving the anonymized pages in `benchmarks/fixtures`, so
+# the real `AttendanceManager` methods run without a network. Each stage is timed on its own:
+#
+#   captcha_solve              captcha solver per image (only with --captcha-corpus)
+#   login                      login page, captcha download and login form (captcha answer is fixed)
+#   attendance_page_parse      `parse_attendance_page` on the attendance page
+#   get_attendance_details     attendance page + every monthly page, fetched and parsed (cold monthly cache)
+#   monthly_absent_parse       `parse_monthly_absent_page` on a monthly page
+#   get_monthly_absent_details one monthly page, fetched and parsed
+#   timetable_transform        `parse_timetable_page` + `build_timetable`
+#   get_timetable              timetable page, fetched, parsed and built
+#
+# Settings are read from the environment / `.env` as usual, but no database or portal connection is needed.
+#
+# Usage:
+#   python benchmarks/pipeline_benchmark.py [--fixtures benchmarks/fixtures] [--captcha-corpus DIR] [--solver template] [--rounds 50]
+#       [--stage login get_timetable ...] [--json] [--output results.json]
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import shutil
+import statistics
+import tempfile
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils import attendance_manager
+from app.utils.attendance_manager import AttendanceManager
+from app.utils.monthly_absent_cache import MonthlyAbsentCache
+from app.utils.legend_cache import LegendCache
+from app.utils.subject_index import SubjectIndex
+from app.utils.captcha_solver import create_captcha_solver
+from app.utils.portal_pages import (
+    parse_attendance_page,
+    attendance_months,
+    parse_monthly_absent_page,
+    parse_timetable_page,
+    build_timetable,
+)
+from captcha_benchmark import SOLVERS, load_corpus, percentile
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+class RecordedPortal:
+    """Serves recorded portal pages by path, the way the portal answers `AttendanceManager` requests."""
+    def __init__(self, fixtures: Path, captcha: bytes) -> None:
+        self.pages = {name: (fixtures / f"{name}.html").read_bytes() for name in ("login", "attendance", "monthly_absent", "timetable")}
+        self.captcha = captcha
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("youLogin.jsp"):
+            if request.method == "GET":
+                return httpx.Response(200, content=self.pages["login"])
+            return httpx.Response(302, headers={"location": "/srmiststudentportal/students/template/HRDSystem.jsp"})
+        if path.endswith("captchas"):
+            return httpx.Response(200, content=self.captcha, headers={"content-type": "image/png"})
+        if path.endswith("studentAttendanceDetails.jsp"):
+            return httpx.Response(200, content=self.pages["attendance"])
+        if path.endswith("studentAttendanceDetailsInner.jsp"):
+            return httpx.Response(200, content=self.pages["monthly_absent"])
+        if path.endswith("studentTimeTableDetails.jsp"):
+            return httpx.Response(200, content=self.pages["timetable"])
+        return httpx.Response(404)
+
+
+class FixedCaptchaAnswer:
+    """Stands in for the OCR pool in the login stage, so it measures the HTTP and form handling only."""
+    async def solve(self, content: bytes) -> str:
+        return "ABCDE"
+
+
+def summarize(timings: list[float]) -> dict[str, float | int]:
+    return {
+        "rounds": len(timings),
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "min_ms": min(timings) * 1000,
+    }
+
+
+async def time_async(make_call, rounds: int, setup=None) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        call = make_call()
+        start = time.perf_counter()
+        await call
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_sync(call, rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def run(fixtures: Path, corpus: list[tuple[str, bytes]], solver_name: str, rounds: int, stages: list[str]) -> dict[str, dict]:
+    results = {}
+    portal = RecordedPortal(fixtures, corpus[0][1] if corpus else b"\x89PNG\r\n\x1a\n")
+    pages = portal.pages
+
+    # Keep caches off the real cache directory, and the subjects index off the database
+    scratch = Path(tempfile.mkdtemp(prefix="pipeline-benchmark-"))
+    attendance_manager.legend_cache = LegendCache(str(scratch / "legends.json"))
+    attendance_manager.subject_index = SubjectIndex(max_age=float("inf"))
+    attendance_manager.subject_index.loaded_at = time.monotonic()
+    attendance_manager.ocr_pool = FixedCaptchaAnswer()
+
+    def cold_monthly_cache() -> None:
+        attendance_manager.monthly_absent_cache = MonthlyAbsentCache(str(scratch / f"monthly_absent_{time.perf_counter_ns()}"))
+
+    # Talk to the recorded portal directly, skipping the shared pool's rate limiter
+    am = AttendanceManager("bench0001", "password")
+    await am.client.aclose()
+    am.client = httpx.AsyncClient(transport=httpx.MockTransport(portal))
+
+    if "captcha_solve" in stages and corpus:
+        solver = create_captcha_solver() if solver_name == "configured" else SOLVERS[solver_name]()
+        timings, solved = [], 0
+        for expected, content in corpus:
+            start = time.perf_counter()
+            solved += solver.solve(content) == expected
+            timings.append(time.perf_counter() - start)
+        results["captcha_solve"] = {**summarize(timings), "solver": solver.name, "solve_rate": solved / len(corpus)}
+
+    if "login" in stages:
+        results["login"] = summarize(await time_async(am.login, rounds, setup=am.client.cookies.clear))
+
+    if "attendance_page_parse" in stages:
+        results["attendance_page_parse"] = summarize(time_sync(lambda: parse_attendance_page(pages["attendance"]), rounds))
+
+    if "get_attendance_details" in stages:
+        _, cumulative = parse_attendance_page(pages["attendance"])
+        results["get_attendance_details"] = {
+            **summarize(await time_async(am.get_attendance_details, rounds, setup=cold_monthly_cache)),
+            "monthly_pages": len(attendance_months(cumulative)),
+        }
+
+    if "monthly_absent_parse" in stages:
+        results["monthly_absent_parse"] = summarize(time_sync(lambda: parse_monthly_absent_page(pages["monthly_absent"]), rounds))
+
+    if "get_monthly_absent_details" in stages:
+        results["get_monthly_absent_details"] = summarize(await time_async(lambda: am.get_monthly_absent_details("Apr", "2024"), rounds))
+
+    if "timetable_transform" in stages:
+        def transform() -> None:
+            timetable, legends = parse_timetable_page(pages["timetable"])
+            build_timetable(timetable, legends)
+        results["timetable_transform"] = summarize(time_sync(transform, rounds))
+
+    if "get_timetable" in stages:
+        results["get_timetable"] = summarize(await time_async(lambda: am.get_timetable(None), rounds))
+
+    await am.close()
+    shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+STAGES = [
+    "captcha_solve",
+    "login",
+    "attendance_page_parse",
+    "get_attendance_details",
+    "monthly_absent_parse",
+    "get_monthly_absent_details",
+    "timetable_transform",
+    "get_timetable",
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Portal scraping pipeline benchmark on recorded pages")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES, help="Directory with the recorded pages")
+    parser.add_argument("--captcha-corpus", type=Path, default=None, help="Directory of captcha images named after their text")
+    parser.add_argument("--solver", choices=["configured", *SOLVERS], default="configured", help="Captcha solver, `configured` uses CAPTCHA_SOLVER")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--stage", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.captcha_corpus) if args.captcha_corpus else []
+    if args.captcha_corpus and not corpus:
+        sys.exit(f"No captcha images found in {args.captcha_corpus}")
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rounds": args.rounds,
+        "stages": asyncio.run(run(args.fixtures, corpus, args.solver, args.rounds, args.stage)),
+    }
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        for name, result in results["stages"].items():
+            extra = f"  solve rate {result['solve_rate']:.1%} ({result['solver']})" if "solve_rate" in result else ""
+            print(
+                f"{name:<28} mean {result['mean_ms']:8.3f} ms  p50 {result['p50_ms']:8.3f} ms"
+                f"  p95 {result['p95_ms']:8.3f} ms  min {result['min_ms']:8.3f} ms{extra}"
+            )
+        if "captcha_solve" in args.stage and not corpus:
+            print("captcha_solve skipped, pass --captcha-corpus to include it")
@@ -0,0 +1,146 @@
+# Path: benchmarks/table_parser_benchmark.py
+# Description: Compares the lxml table parser against the old BeautifulSoup + `pd.read_html` + `ast.literal_eval` path.
+#
+# Usage:
+#   python benchmarks/table_parser_benchmark.py [--fixtures benchmarks/fixtures] [--rounds 200] [--json]
+
+import sys
+import ast
+import json
+import time
+import argparse
+import statistics
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils.portal_pages import (
+    MONTH_MAP,
+    parse_attendance_page,
+    attendance_months,
+    parse_monthly_absent_page,
+    parse_timetable_page,
+    build_timetable,
+)
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+# Old parsing path, kept here only as the benchmark baseline.
+# Two differences are normalized so outputs can be compared: `literal_eval` of `to_json` kept JSON's `\/`
+# escape in column names (`OD\/ML Percentage`), and empty timetable slots came out as NaN instead of `None`.
+def unescape(records: list[dict]) -> list[dict]:
+    return [{key.replace("\\/", "/"): value for key, value in record.items()} for record in records]
+
+
+def legacy_attendance(text: str) -> tuple[list[dict], list[tuple[int, str]]]:
+    attendance_page = BeautifulSoup(text, "html.parser")
+    attendance_table = attendance_page.find_all("table", class_="table")[0]
+    attendance_df = pd.read_html(StringIO(str(attendance_table)))[0]
+    attendance_df = attendance_df[~attendance_df["Code"].isin(["CL", "Total"])]
+    cumulative_attendance_table = attendance_page.find_all("table", class_="table")[1]
+    cumulative_attendance_df = pd.read_html(StringIO(str(cumulative_attendance_table)))[0]
+    month_year = []
+    for _, row in cumulative_attendance_df.iterrows():
+        mon, year = row["Month / Year"].split(" / ")
+        month_year.append((MONTH_MAP[mon], year))
+    return unescape(ast.literal_eval(attendance_df.to_json(orient="records"))), month_year
+
+
+def legacy_monthly_absent(text: str) -> list[dict]:
+    absent_details = pd.read_html(StringIO(str(text)))[0]
+    return unescape(ast.literal_eval(absent_details.to_json(orient="records")))
+
+
+def legacy_timetable(text: str) -> dict:
+    soup = BeautifulSoup(text, "html.parser")
+    timetable, legends = soup.find_all("table", class_="table")
+    timetable = pd.read_html(StringIO(str(timetable)))[0]
+    legends = pd.read_html(StringIO(str(legends)))[0]
+    timetable.replace("-", pd.NA, inplace=True)
+    timetable.columns = timetable.columns.droplevel(0)
+    timetable.rename(columns={"Day order": "Day"}, inplace=True)
+    legends.rename(columns={"Code": "SubCode", "Description": "SubName"}, inplace=True)
+    sub_map = {data["SubCode"].strip(): data["SubName"].strip() for data in legends.to_dict(orient="records")}
+    for idx, row in timetable.iterrows():
+        for col in timetable.columns:
+            if row[col] in sub_map:
+                timetable.at[idx, col] = sub_map[row[col]]
+            elif isinstance(row[col], str) and len(row[col].split(" ")) > 1:
+                timetable.at[idx, col] = " / ".join(sub_map[sub_code] for sub_code in row[col].split(" "))
+    timetable.drop("04:00-04:50", axis=1, inplace=True)
+    timetable.columns = ["Day", "9:20-10:10", "10:10-11:00", "11:10-12:00", "12:00-12:50", "2:00-2:50", "2:50-3:40", "3:40-4:30"]
+    timetable.drop(5, inplace=True)
+    new_timetable = {}
+    for item in timetable.to_dict(orient="records"):
+        day = item.pop("Day")
+        new_timetable[day] = {key: (None if pd.isna(value) else value) for key, value in item.items()}
+    return new_timetable
+
+
+# Current parsing path
+def current_attendance(content: bytes) -> tuple[list[dict], list[tuple[int, str]]]:
+    attendance, cumulative_attendance = parse_attendance_page(content)
+    return attendance, attendance_months(cumulative_attendance)
+
+
+def current_timetable(content: bytes) -> dict:
+    timetable, legends = parse_timetable_page(content)
+    return build_timetable(timetable, legends)
+
+
+PAGES = {
+    "attendance": ("attendance.html", legacy_attendance, current_attendance),
+    "monthly_absent": ("monthly_absent.html", legacy_monthly_absent, parse_monthly_absent_page),
+    "timetable": ("timetable.html", legacy_timetable, current_timetable),
+}
+
+
+def timeit(function, argument, rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def benchmark(fixtures: Path, rounds: int) -> list[dict[str, float | str | bool]]:
+    results = []
+    for page, (filename, legacy, current) in PAGES.items():
+        content = (fixtures / filename).read_bytes()
+        text = content.decode()
+
+        legacy_times = timeit(legacy, text, rounds)
+        current_times = timeit(current, content, rounds)
+        results.append({
+            "page": page,
+            "same_output": legacy(text) == current(content),
+            "legacy_ms": statistics.median(legacy_times) * 1000,
+            "current_ms": statistics.median(current_times) * 1000,
+            "speedup": statistics.median(legacy_times) / statistics.median(current_times),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTML table parser benchmark")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = benchmark(args.fixtures, args.rounds)
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        for result in results:
+            print(
+                f"{result['page']:<16} legacy {result['legacy_ms']:.3f} ms  current {result['current_ms']:.3f} ms"
+                f"  speedup {result['speedup']:.1f}x  same output: {result['same_output']}"
+            )
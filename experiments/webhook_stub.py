@@ -0,0 +1,56 @@
+"""Local webhook receiver for trying out webhook delivery.
+
+Prints every request it receives and can fail or slow down on purpose to exercise retries:
+
+    python experiments/webhook_stub.py --port 8900 --fail-rate 0.3 --delay 0.5
+
+Start the app with `WEBHOOK_ALLOW_PRIVATE_ADDRESSES=true` (loopback targets are rejected otherwise), then register it
+with `POST /webhooks/` and `{"username": "...", "url": "http://127.0.0.1:8900/hook", "batch_size": 10}`.
+"""
+
+import json
+import time
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8900)
+parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with --fail-status")
+parser.add_argument("--fail-status", type=int, default=503)
+parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before answering")
+args = parser.parse_args()
+
+received = 0
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        global received
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(args.delay)
+
+        if random.random() < args.fail_rate:
+            self.send_response(args.fail_status)
+            self.end_headers()
+            print(f"{self.path}: answered {args.fail_status}")
+            return
+
+        payload = json.loads(body)
+        received += len(payload.get("notifications", []))
+        print(f"{self.path}: {len(payload.get('notifications', []))} notifications ({received} total)")
+        print(payload.get("message", ""))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"status": "ok"}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    print(f"Listening on http://{args.host}:{args.port}")
+    ThreadingHTTPServer((args.host, args.port), WebhookHandler).serve_forever()